@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Location, Post
+from . import search
+from .models import Category, Comment, ImageTask, Location, Post
+from .pagination import EstimatedCountPaginator
 
 
 @admin.register(Category)
@@ -19,10 +21,41 @@ class LocationAdmin(admin.ModelAdmin):
 class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'text', 'pub_date', 'author',
                     'location', 'category')
-    search_fields = ('title', 'pub_date', 'author')
+    list_select_related = ('author', 'location', 'category')
+    search_fields = ('^author__username', )
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'location', 'category')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """Match authors by username prefix and posts via the search index."""
+        by_author, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if not search_term.strip():
+            return by_author, may_have_duplicates
+        return (
+            by_author | queryset.filter(search.matching(search_term)),
+            may_have_duplicates,
+        )
 
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('text', 'created_at', 'author')
-    search_fields = ('text', 'created_at', 'author')
+    list_select_related = ('author', )
+    # Comment texts are not in the search index and a LIKE over the whole
+    # table is too slow, so comments are found by author and date only.
+    search_fields = ('^author__username', )
+    date_hierarchy = 'created_at'
+    autocomplete_fields = ('author', 'post')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ImageTask)
+class ImageTaskAdmin(admin.ModelAdmin):
+    list_display = ('post', 'status', 'attempts', 'run_after', 'last_error')
+    list_filter = ('status', )
+    raw_id_fields = ('post', )
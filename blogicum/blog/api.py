@@ -0,0 +1,179 @@
+"""Read-only JSON API over the public feeds, posts and comments.
+
+Lists are keyset-paginated (``?after=``, ``?limit=``) and every endpoint
+accepts ``?fields=a,b`` to return only some fields. Visibility rules and
+querysets are the ones of the HTML views, so a page costs a fixed number
+of queries.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.paginator import InvalidPage
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_safe
+
+from .lookups import categories
+from .models import Post
+from .pagination import CommentCursorPaginator, CursorPaginator
+from .views import get_post_or_404
+
+User = get_user_model()
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _category(post):
+    category = post.category
+    if category is None:
+        return None
+    return {"slug": category.slug, "title": category.title}
+
+
+def _location(post):
+    location = post.location
+    if location is None or not location.is_published:
+        return None
+    return location.title
+
+
+POST_FIELDS = {
+    "id": lambda post: post.pk,
+    "url": lambda post: reverse("blog:post_detail", args=(post.pk, )),
+    "title": lambda post: post.title,
+    "text": lambda post: post.text,
+    "pub_date": lambda post: post.pub_date.isoformat(),
+    "author": lambda post: post.author.username,
+    "category": _category,
+    "location": _location,
+    "image": lambda post: post.image.url if post.image else None,
+    "comment_count": lambda post: post.comment_count,
+}
+
+COMMENT_FIELDS = {
+    "id": lambda comment: comment.pk,
+    "author": lambda comment: comment.author.username,
+    "text": lambda comment: comment.text,
+    "created_at": lambda comment: comment.created_at.isoformat(),
+}
+
+
+def api_view(view):
+    """GET-only JSON view; errors are reported as ``{"error": ...}``."""
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            data = view(request, *args, **kwargs)
+        except Http404 as e:
+            return _json({"error": str(e) or "Не найдено."}, status=404)
+        except BadRequest as e:
+            return _json({"error": str(e)}, status=400)
+        return _json(data)
+
+    return wrapper
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={
+        "ensure_ascii": False, "separators": (",", ":"),
+    })
+
+
+def requested_fields(request, available):
+    """Fields listed in ``?fields=``, all of ``available`` by default."""
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(available)
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise BadRequest(f"Неизвестные поля: {', '.join(unknown)}.")
+    return fields
+
+
+def serialize(obj, fields, available):
+    return {name: available[name](obj) for name in fields}
+
+
+def _page_size(request):
+    try:
+        limit = int(request.GET.get("limit", settings.BLOG_API_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest("Параметр limit должен быть числом.")
+    return min(max(limit, 1), settings.BLOG_API_MAX_PAGE_SIZE)
+
+
+def paginate(request, queryset, paginator_class, available):
+    fields = requested_fields(request, available)
+    if "text" not in fields:
+        queryset = queryset.defer("text")
+    paginator = paginator_class(queryset, _page_size(request))
+    try:
+        page = paginator.page(request.GET.get("after"))
+    except InvalidPage as e:
+        raise BadRequest(str(e))
+    next_url = None
+    if page.has_next():
+        query = request.GET.copy()
+        query["after"] = page.next_cursor
+        next_url = f"{request.path}?{query.urlencode()}"
+    return {
+        "results": [serialize(obj, fields, available) for obj in page],
+        "next": next_url,
+    }
+
+
+@api_view
+def post_list(request):
+    return paginate(
+        request, Post.objects.visible(), CursorPaginator, POST_FIELDS
+    )
+
+
+@api_view
+def category_post_list(request, category_slug):
+    category = categories.get_by_slug(category_slug)
+    if category is None or not category.is_published:
+        raise Http404("Категория не найдена.")
+    return paginate(
+        request,
+        Post.objects.visible().filter(category=category.pk),
+        CursorPaginator,
+        POST_FIELDS,
+    )
+
+
+@api_view
+def profile_post_list(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.user == author:
+        posts = Post.objects.for_feed()
+    else:
+        posts = Post.objects.visible()
+    return paginate(
+        request, posts.filter(author=author), CursorPaginator, POST_FIELDS
+    )
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = requested_fields(request, POST_FIELDS)
+    return serialize(
+        get_post_or_404(request.user, post_id), fields, POST_FIELDS
+    )
+
+
+@api_view
+def comment_list(request, post_id):
+    post = get_post_or_404(request.user, post_id)
+    return paginate(
+        request,
+        post.comments.select_related("author"),
+        CommentCursorPaginator,
+        COMMENT_FIELDS,
+    )
@@ -0,0 +1,179 @@
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+POST_CARD_TEMPLATE = "includes/post_card.html"
+TIMESTAMP_SECONDS = re.compile(r"(\d{4}-\d\d-\d\d[ T]\d\d:\d\d):\d\d(\.\d+)?")
+# Seconds between writes of a process's card hit/miss counts to the cache.
+STATS_FLUSH_INTERVAL = 60
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_stats_flushed_at = time.monotonic()
+
+
+def get_cache():
+    return caches[settings.BLOG_CACHE_ALIAS]
+
+
+def _version_key(kind, pk):
+    return f"blog:version:{kind}:{pk}"
+
+
+def _fresh_version():
+    # Versions start from the clock rather than from zero, so a counter
+    # evicted from the cache can never come back with an old value.
+    return time.time_ns()
+
+
+def after_commit(func):
+    """Run ``func`` now and once more when the current transaction commits.
+
+    The first run keeps the writer's own requests consistent. Between it
+    and the commit, other requests still read the old rows and may cache
+    them under the new version; the second run drops those entries.
+    """
+    func()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(func)
+
+
+def bump_version(kind, pk="all"):
+    """Invalidate every cache entry built from the given object."""
+    key = _version_key(kind, pk)
+    after_commit(lambda: get_cache().set(key, _fresh_version(), None))
+
+
+def get_versions(*objects):
+    """Current versions for ``(kind, pk)`` pairs, creating missing ones."""
+    cache = get_cache()
+    keys = [_version_key(kind, pk) for kind, pk in objects]
+    versions = cache.get_many(keys)
+    missing = {key: _fresh_version() for key in keys if key not in versions}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def _count(name):
+    # Counted in process and written to the cache at most once per
+    # STATS_FLUSH_INTERVAL, so serving a card from the cache stays a read.
+    global _stats_flushed_at
+    with _stats_lock:
+        _stats[name] += 1
+        now = time.monotonic()
+        if now - _stats_flushed_at < STATS_FLUSH_INTERVAL:
+            return
+        _stats_flushed_at = now
+    flush_card_cache_stats()
+
+
+def flush_card_cache_stats():
+    """Add the hits and misses counted by this process to the shared ones."""
+    with _stats_lock:
+        pending = dict(_stats)
+        _stats.clear()
+    cache = get_cache()
+    for name, value in pending.items():
+        key = f"blog:stats:{name}"
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            # Evicted between add() and incr(); the counts are approximate.
+            cache.set(key, value, None)
+
+
+def card_cache_stats():
+    flush_card_cache_stats()
+    cache = get_cache()
+    stats = cache.get_many(["blog:stats:card_hit", "blog:stats:card_miss"])
+    hits = stats.get("blog:stats:card_hit", 0)
+    misses = stats.get("blog:stats:card_miss", 0)
+    return {"hits": hits, "misses": misses}
+
+
+def reset_card_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+    get_cache().delete_many(["blog:stats:card_hit", "blog:stats:card_miss"])
+
+
+def post_card_key(post):
+    versions = get_versions(
+        ("post_card", "all"),
+        ("post", post.pk),
+        ("user", post.author_id),
+        ("category", post.category_id),
+        ("location", post.location_id),
+    )
+    return "blog:post_card:{}:{}".format(
+        post.pk, ":".join(str(version) for version in versions)
+    )
+
+
+def render_post_card(post, render):
+    """Cached HTML of a post card; ``render`` builds it on a miss."""
+    cache = get_cache()
+    key = post_card_key(post)
+    html = cache.get(key)
+    if html is not None:
+        _count("card_hit")
+        return html
+    _count("card_miss")
+    html = render()
+    cache.set(key, html, settings.BLOG_POST_CARD_CACHE_TIMEOUT)
+    return html
+
+
+def feed_generation():
+    """Counter bumped by every write that can change a public feed page."""
+    return get_versions(("feed", "all"))[0]
+
+
+def page_cache_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"blog:page:{feed_generation()}:{path}"
+
+
+def store_page(key, response, timeout):
+    if timeout > 0:
+        get_cache().set(
+            key, (response.content, response["Content-Type"]), timeout
+        )
+
+
+def cached_validators(scope, aggregate, timeout):
+    """Result of ``aggregate()`` for ``scope``, kept for one generation."""
+    generation = feed_generation()
+    digest = hashlib.md5(f"{scope}:{generation}".encode()).hexdigest()
+    key = f"blog:validators:{digest}"
+    cache = get_cache()
+    values = cache.get(key)
+    if values is None:
+        values = aggregate()
+        if timeout > 0:
+            cache.set(key, values, timeout)
+    return generation, values
+
+
+def cached_count(queryset, timeout):
+    """``queryset.count()``, reused for ``timeout`` seconds."""
+    # Feeds filter on ``now()``; drop seconds so that their counts are shared.
+    sql = TIMESTAMP_SECONDS.sub(r"\1", str(queryset.query))
+    digest = hashlib.md5(sql.encode()).hexdigest()
+    key = f"blog:count:{digest}"
+    cache = get_cache()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
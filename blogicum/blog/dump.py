@@ -0,0 +1,113 @@
+"""Record format shared by ``export_blog`` and ``import_blog``.
+
+Records look like ``dumpdata`` output (and ``db.json``):
+``{"model": "blog.post", "pk": 1, "fields": {"author": 3, ...}}``,
+foreign keys as raw ids.
+"""
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connection
+
+from .cache import bump_version
+from .schedule import forget_next_publication
+
+# Export order; every model only refers to models listed before it.
+MODELS = {
+    "users": "auth.user",
+    "categories": "blog.category",
+    "locations": "blog.location",
+    "posts": "blog.post",
+    "comments": "blog.comment",
+}
+
+# Field the --since/--until filters apply to.
+DATE_FIELDS = {
+    "auth.user": "date_joined",
+    "blog.category": "created_at",
+    "blog.location": "created_at",
+    "blog.post": "pub_date",
+    "blog.comment": "created_at",
+}
+
+# Reference rows are matched to existing ones by these unique fields on
+# import; posts and comments keep their ids.
+NATURAL_KEYS = {
+    "auth.user": "username",
+    "blog.category": "slug",
+}
+
+# Reference rows without a unique field: always inserted, under new ids.
+RENUMBERED_MODELS = {"blog.location"}
+
+# Older field names still found in dumps such as db.json.
+RENAMED_FIELDS = {
+    "blog.location": {"name": "title"},
+}
+
+# Never leaves the database.
+EXCLUDED_FIELDS = {
+    "auth.user": {"password"},
+}
+
+
+def get_model(label):
+    return apps.get_model(label)
+
+
+def record_fields(label):
+    """Concrete non-pk fields of a model that go into records."""
+    model = get_model(label)
+    excluded = EXCLUDED_FIELDS.get(label, set())
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in excluded
+    ]
+
+
+def read_records(path):
+    """Records of a ``.jsonl`` file one line at a time, or a JSON array."""
+    path = Path(path)
+    with open(path, encoding="utf-8") as stream:
+        if path.suffix != ".jsonl":
+            yield from json.load(stream)
+            return
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+@contextmanager
+def keep_timestamps(*models):
+    """Let ``bulk_create`` store given ``auto_now_add`` values as they are."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def after_bulk_insert(models):
+    """Catch up, once, on what ``save()`` and its signals do for every row.
+
+    Resets id sequences after inserts with explicit ids, recounts comments
+    and invalidates cached pages. The search index is left to the caller.
+    """
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+    comment_model = get_model("blog.comment")
+    if comment_model in models:
+        get_model("blog.post").objects.recount_comments()
+    for kind in ("user", "category", "location", "post_card", "feed"):
+        bump_version(kind)
+    forget_next_publication()
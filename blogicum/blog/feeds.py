@@ -0,0 +1,157 @@
+"""RSS and Atom feeds of the site, of every category and of every author.
+
+Rendered feeds are kept in the blog cache for one feed generation and
+served with a content-based ETag, so polling readers mostly get 304.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_response_headers
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.utils.text import Truncator
+
+from .cache import feed_generation, get_cache
+from .lookups import categories
+from .models import Post
+from .schedule import publication_aware_timeout
+
+User = get_user_model()
+
+
+class PostFeed(Feed):
+    title = "Блогикум"
+    description = "Новые публикации Блогикума."
+
+    def link(self):
+        return reverse("blog:index")
+
+    def get_posts(self, obj):
+        return Post.objects.visible()
+
+    def items(self, obj):
+        return self.get_posts(obj)[:settings.BLOG_SYNDICATION_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).chars(500)
+
+    def item_link(self, item):
+        return reverse("blog:post_detail", args=(item.pk, ))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_author_link(self, item):
+        return reverse("blog:profile", args=(item.author.username, ))
+
+    def item_categories(self, item):
+        return (item.category.title, ) if item.category else ()
+
+
+class CategoryPostFeed(PostFeed):
+
+    def get_object(self, request, category_slug):
+        category = categories.get_by_slug(category_slug)
+        if category is None or not category.is_published:
+            raise Http404("Категория не найдена.")
+        return category
+
+    def title(self, obj):
+        return f"Блогикум: {obj.title}"
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse("blog:category_posts", args=(obj.slug, ))
+
+    def get_posts(self, obj):
+        return Post.objects.visible().filter(category=obj.pk)
+
+
+class AuthorPostFeed(PostFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f"Блогикум: @{obj.username}"
+
+    def description(self, obj):
+        return f"Публикации пользователя @{obj.username}."
+
+    def link(self, obj):
+        return reverse("blog:profile", args=(obj.username, ))
+
+    def get_posts(self, obj):
+        return Post.objects.visible().filter(author=obj)
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr("description", obj)
+
+
+class PostAtomFeed(AtomMixin, PostFeed):
+    pass
+
+
+class CategoryPostAtomFeed(AtomMixin, CategoryPostFeed):
+    pass
+
+
+class AuthorPostAtomFeed(AtomMixin, AuthorPostFeed):
+    pass
+
+
+def cached_feed(feed):
+    """View serving ``feed`` from the cache with ETag and Last-Modified."""
+    def view(request, *args, **kwargs):
+        generation = feed_generation()
+        # Feeds hold absolute links, so the host is part of the key.
+        uri = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"blog:feed:{generation}:{uri}"
+        cache = get_cache()
+        cached = cache.get(key)
+        if cached is None:
+            response = feed(request, *args, **kwargs)
+            # Edits change no pub_date; the generation is the write time.
+            last_modified = max(
+                generation // 10 ** 9,
+                parse_http_date_safe(response.get("Last-Modified", "")) or 0,
+            )
+            cached = (response.content, response["Content-Type"],
+                      last_modified)
+            timeout = publication_aware_timeout(
+                settings.BLOG_PAGE_CACHE_TIMEOUT
+            )
+            if timeout > 0:
+                cache.set(key, cached, timeout)
+        content, content_type, last_modified = cached
+        etag = quote_etag(hashlib.md5(content).hexdigest())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        patch_response_headers(
+            response, publication_aware_timeout(settings.BLOG_FEED_MAX_AGE)
+        )
+        return response
+
+    return view
@@ -0,0 +1,143 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+# Pillow format name, extension and save options for every rendition kind.
+FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True,
+                             "progressive": True}),
+}
+
+
+def _store(image_file, content, extension):
+    """Save derived ``content`` next to ``image_file``; returns its name.
+
+    The post image storage names files after their bytes, so a rewritten
+    file gets a new name and an existing name never changes content.
+    """
+    name = image_file.field.generate_filename(None, f"derived.{extension}")
+    return image_file.storage.save(name, ContentFile(content))
+
+
+def rendition_widths(original_width):
+    """Widths to produce for an image; originals are never upscaled."""
+    return [
+        width for width in settings.BLOG_IMAGE_WIDTHS
+        if width < original_width
+    ]
+
+
+def rendition_name(name, width, fmt):
+    """Name of a rendition written before renditions were content-hashed."""
+    stem, _ = os.path.splitext(name)
+    return f"{stem}_{width}w.{FORMATS[fmt][1]}"
+
+
+def rendition_files(renditions):
+    """``{format: [name per width]}`` of the stored renditions."""
+    if "files" in renditions:
+        return renditions["files"]
+    return {
+        fmt: [
+            rendition_name(renditions["name"], width, fmt)
+            for width in renditions["widths"]
+        ]
+        for fmt in FORMATS
+    }
+
+
+def rendition_names(renditions):
+    return [
+        name for names in rendition_files(renditions).values()
+        for name in names
+    ]
+
+
+def is_current_name(name, renditions):
+    return bool(renditions) and renditions.get("name") == name
+
+
+def is_current(image_file, renditions):
+    """Whether ``renditions`` were made from the file now in the field."""
+    return is_current_name(image_file.name, renditions)
+
+
+def normalize_original(image_file):
+    """Apply the EXIF orientation and drop EXIF data from the original.
+
+    Files without EXIF are left untouched to avoid a lossy re-encode.
+    Returns the name of the normalized file, which is a new one whenever
+    the file was rewritten.
+    """
+    storage = image_file.storage
+    with storage.open(image_file.name, "rb") as fh:
+        source = Image.open(fh)
+        source.load()
+    if not source.getexif():
+        return image_file.name
+    pil_format = source.format
+    upright = ImageOps.exif_transpose(source)
+    upright.info.pop("exif", None)
+    buffer = BytesIO()
+    options = {"quality": 90} if pil_format == "JPEG" else {}
+    upright.save(buffer, pil_format, **options)
+    extension = os.path.splitext(image_file.name)[1].lstrip(".")
+    return _store(image_file, buffer.getvalue(), extension)
+
+
+def make_renditions(image_file):
+    """Write resized WebP and JPEG copies next to the original file.
+
+    Returns the metadata stored in ``Post.image_renditions``.
+    """
+    storage = image_file.storage
+    with storage.open(image_file.name, "rb") as fh:
+        source = Image.open(fh)
+        source.load()
+    if source.mode not in ("RGB", "L"):
+        source = source.convert("RGB")
+    widths = rendition_widths(source.width)
+    files = {fmt: [] for fmt in FORMATS}
+    for width in widths:
+        height = max(round(source.height * width / source.width), 1)
+        resized = source.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt, (pil_format, extension, options) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            files[fmt].append(
+                _store(image_file, buffer.getvalue(), extension)
+            )
+    return {
+        "name": image_file.name,
+        "width": source.width,
+        "height": source.height,
+        "widths": widths,
+        "files": files,
+    }
+
+
+def delete_renditions(renditions, storage):
+    if not renditions:
+        return
+    for name in rendition_names(renditions):
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def srcset(image_file, renditions, fmt):
+    """``srcset`` value for one format; JPEG also offers the original."""
+    if not image_file or not is_current(image_file, renditions):
+        return ""
+    storage = image_file.storage
+    names = rendition_files(renditions)[fmt]
+    candidates = [
+        f"{storage.url(name)} {width}w"
+        for name, width in zip(names, renditions["widths"])
+    ]
+    if candidates and fmt == "jpeg":
+        candidates.append(f"{image_file.url} {renditions['width']}w")
+    return ", ".join(candidates)
@@ -0,0 +1,82 @@
+"""In-process copies of the small ``Category`` and ``Location`` tables.
+
+Every process keeps all rows of both tables in memory and reloads them
+with one query when the table version in the blog cache changes (see
+``signals``) or after ``BLOG_LOOKUP_TTL`` seconds. Rows are shared between
+requests and must not be modified.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models.query import ModelIterable
+
+from .cache import get_versions
+
+
+class LookupTable:
+
+    def __init__(self, model_label, kind, slug_field=None):
+        self.model_label = model_label
+        self.kind = kind
+        self.slug_field = slug_field
+        self._lock = threading.Lock()
+        self._snapshot = (None, 0, {}, {})
+
+    def _is_current(self, snapshot, version):
+        age = time.monotonic() - snapshot[1]
+        return snapshot[0] == version and age < settings.BLOG_LOOKUP_TTL
+
+    def _load(self):
+        # A write bumps the version before it commits and again once it
+        # has (see ``cache.bump_version``). Rows read between the two bumps
+        # may be stale but are stored under the first version, so the
+        # second one makes the next call reload. The TTL bounds staleness
+        # when no bump comes: queryset updates that skip the signals, or a
+        # version evicted from the cache.
+        version = get_versions((self.kind, "all"))[0]
+        snapshot = self._snapshot
+        if self._is_current(snapshot, version):
+            return snapshot
+        with self._lock:
+            if self._is_current(self._snapshot, version):
+                return self._snapshot
+            loaded_at = time.monotonic()
+            rows = list(apps.get_model(self.model_label).objects.all())
+            by_slug = {}
+            if self.slug_field:
+                by_slug = {getattr(row, self.slug_field): row for row in rows}
+            self._snapshot = (
+                version, loaded_at, {row.pk: row for row in rows}, by_slug
+            )
+            return self._snapshot
+
+    def get(self, pk):
+        return self._load()[2].get(pk)
+
+    def get_by_slug(self, slug):
+        return self._load()[3].get(slug)
+
+    def all(self):
+        return list(self._load()[2].values())
+
+
+categories = LookupTable("blog.Category", "category", slug_field="slug")
+locations = LookupTable("blog.Location", "location")
+
+# Foreign keys filled from the tables above instead of a join.
+LOOKUP_FIELDS = (("category", categories), ("location", locations))
+
+
+class LookupIterable(ModelIterable):
+    """``ModelIterable`` that resolves ``LOOKUP_FIELDS`` from memory."""
+
+    def __iter__(self):
+        for obj in super().__iter__():
+            for name, table in LOOKUP_FIELDS:
+                pk = obj.__dict__.get(f"{name}_id")
+                related = table.get(pk) if pk is not None else None
+                if related is not None:
+                    setattr(obj, name, related)
+            yield obj
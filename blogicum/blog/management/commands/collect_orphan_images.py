@@ -0,0 +1,63 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog import images
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Удаляет файлы изображений, не связанные с публикациями."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать, что будет удалено.",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=settings.BLOG_ORPHAN_IMAGE_MIN_AGE,
+            help="Не трогать файлы, записанные или повторно использованные "
+                 "за указанное число секунд.",
+        )
+
+    def walk(self, storage, path):
+        dirs, files = storage.listdir(path)
+        for name in files:
+            yield os.path.join(path, name)
+        for name in dirs:
+            yield from self.walk(storage, os.path.join(path, name))
+
+    def handle(self, *args, dry_run=False, min_age=None, **options):
+        field = Post._meta.get_field("image")
+        storage = field.storage
+        if not storage.exists(field.upload_to):
+            return
+        referenced = set()
+        posts = Post.objects.exclude(image="").values_list(
+            "image", "image_renditions"
+        )
+        for name, renditions in posts.iterator(chunk_size=2000):
+            referenced.add(name)
+            if images.is_current_name(name, renditions):
+                referenced.update(images.rendition_names(renditions))
+        cutoff = timezone.now() - timedelta(seconds=min_age)
+        removed = 0
+        for name in self.walk(storage, field.upload_to):
+            if name in referenced:
+                continue
+            if dry_run:
+                if storage.get_modified_time(name) <= cutoff:
+                    removed += 1
+                    self.stdout.write(name)
+            elif storage.release(name, min_age):
+                removed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"Лишних файлов: {removed}"
+            + (" (не удалены)" if dry_run else "")
+        ))
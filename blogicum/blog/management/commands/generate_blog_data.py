@@ -0,0 +1,276 @@
+import random
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+from PIL import Image, ImageDraw
+
+from blog import images, search
+from blog.dump import after_bulk_insert, keep_timestamps
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Pareto shape giving roughly the 80/20 split seen on real blogs: a few
+# prolific authors and a few posts that collect most of the comments.
+SKEW = 1.16
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу случайными, но воспроизводимыми данными для "
+        "нагрузочного тестирования."
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ("users", 50, "Пользователей."),
+            ("categories", 10, "Категорий."),
+            ("locations", 30, "Местоположений."),
+            ("posts", 1000, "Публикаций."),
+            ("comments", 5000, "Комментариев."),
+            ("image-files", 8, "Разных файлов изображений."),
+            ("batch-size", 1000, "Строк в одной вставке."),
+            ("seed", 0, "Зерно генератора; с тем же зерном данные те же."),
+        ):
+            parser.add_argument(
+                f"--{name}", type=int, default=default, help=help_text
+            )
+        for name, default, help_text in (
+            ("future", 0.05, "Доля отложенных публикаций."),
+            ("unpublished", 0.05, "Доля скрытых записей."),
+            ("images", 0.2, "Доля публикаций с фото."),
+        ):
+            parser.add_argument(
+                f"--{name}", type=float, default=default, help=help_text
+            )
+        parser.add_argument(
+            "--password",
+            help="Пароль всех пользователей; без него войти под ними нельзя.",
+        )
+        parser.add_argument(
+            "--locale", default="ru_RU", help="Локаль Faker.",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 and options["posts"]:
+            raise CommandError("Для публикаций нужен хотя бы один автор.")
+        self.options = options
+        self.batch_size = options["batch_size"]
+        self.random = random.Random(options["seed"])
+        self.fake = Faker(options["locale"])
+        self.fake.seed_instance(options["seed"])
+        self.now = timezone.now()
+        started = perf_counter()
+
+        users = self.make_users()
+        categories = self.make_reference(Category, options["categories"])
+        locations = self.make_reference(Location, options["locations"])
+        pictures = self.make_pictures()
+        posts = self.make_posts(users, categories, locations, pictures)
+        comments = self.make_comments(users, posts)
+        after_bulk_insert([User, Category, Location, Post, Comment])
+
+        created = (
+            len(users) + len(categories) + len(locations)
+            + options["posts"] + comments
+        )
+        elapsed = perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Создано: пользователей {len(users)}, категорий "
+            f"{len(categories)}, местоположений {len(locations)}, "
+            f"публикаций {options['posts']}, комментариев {comments} "
+            f"за {elapsed:.1f} с ({created / max(elapsed, 1e-9):.0f} строк/с)"
+        ))
+
+    def next_ids(self, model, count):
+        """Explicit ids, so rows can refer to each other before insertion."""
+        start = (model.objects.aggregate(top=Max("pk"))["top"] or 0) + 1
+        return range(start, start + count)
+
+    def insert(self, model, objects):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                self.insert_batch(model, batch)
+                batch = []
+        self.insert_batch(model, batch)
+
+    def insert_batch(self, model, batch):
+        if batch:
+            with transaction.atomic(), keep_timestamps(model):
+                model.objects.bulk_create(batch)
+                if model is Post:
+                    search.index_posts(
+                        (post.pk, post.title, post.text) for post in batch
+                    )
+
+    def hidden(self):
+        return self.random.random() < self.options["unpublished"]
+
+    def past(self, days):
+        seconds = self.random.uniform(0, days * 86400)
+        return self.now - timedelta(seconds=seconds)
+
+    def make_users(self):
+        password = self.options["password"]
+        # Hashing is deliberately slow; every user shares one hash.
+        password = make_password(password if password else None)
+        ids = self.next_ids(User, self.options["users"])
+        self.insert(User, (
+            User(
+                pk=pk,
+                username=f"{self.fake.user_name()}{pk}",
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                email=self.fake.email(),
+                password=password,
+                date_joined=self.past(3 * 365),
+            )
+            for pk in ids
+        ))
+        return list(ids)
+
+    def make_reference(self, model, count):
+        ids = self.next_ids(model, count)
+        objects = []
+        for pk in ids:
+            fields = {
+                "pk": pk,
+                "is_published": not self.hidden(),
+                "created_at": self.past(3 * 365),
+            }
+            if model is Category:
+                fields.update(
+                    title=self.fake.word().capitalize(),
+                    description=self.fake.sentence(),
+                    slug=f"category-{pk}",
+                )
+            else:
+                fields["title"] = self.fake.city()
+            objects.append(model(**fields))
+        self.insert(model, objects)
+        return list(ids)
+
+    def make_pictures(self):
+        """A few stored images with renditions, shared between posts."""
+        if not self.options["posts"] or not self.options["images"]:
+            return []
+        field = Post._meta.get_field("image")
+        pictures = []
+        for _ in range(self.options["image_files"]):
+            picture = Image.new("RGB", (1200, 800), self.color())
+            draw = ImageDraw.Draw(picture)
+            for _ in range(12):
+                x, y = self.random.randrange(1200), self.random.randrange(800)
+                draw.rectangle(
+                    (x, y, x + self.random.randrange(50, 400),
+                     y + self.random.randrange(50, 300)),
+                    fill=self.color(),
+                )
+            content = BytesIO()
+            picture.save(content, format="JPEG", quality=85)
+            name = field.storage.save(
+                field.generate_filename(None, "generated.jpg"),
+                ContentFile(content.getvalue()),
+            )
+            image_file = Post(image=name).image
+            pictures.append((name, images.make_renditions(image_file)))
+        return pictures
+
+    def color(self):
+        return tuple(self.random.randrange(256) for _ in range(3))
+
+    def make_posts(self, users, categories, locations, pictures):
+        """Create posts; returns ``(pk, pub_date)`` of the past-dated ones."""
+        options = self.options
+        author_weights = list(accumulate(
+            self.random.paretovariate(SKEW) for _ in users
+        ))
+        dated = []
+
+        def posts():
+            for pk in self.next_ids(Post, options["posts"]):
+                if self.random.random() < options["future"]:
+                    pub_date = self.now + timedelta(
+                        seconds=self.random.uniform(3600, 30 * 86400)
+                    )
+                    created_at = self.past(7)
+                else:
+                    pub_date = self.past(365)
+                    created_at = pub_date
+                image = {}
+                if pictures and self.random.random() < options["images"]:
+                    name, renditions = self.random.choice(pictures)
+                    image = dict(
+                        image=name,
+                        image_renditions=renditions,
+                        image_status="ready",
+                    )
+                post = Post(
+                    pk=pk,
+                    title=self.fake.sentence(nb_words=5).rstrip("."),
+                    text="\n\n".join(
+                        self.fake.paragraphs(self.random.randint(1, 6))
+                    ),
+                    pub_date=pub_date,
+                    created_at=created_at,
+                    is_published=not self.hidden(),
+                    author_id=self.random.choices(
+                        users, cum_weights=author_weights
+                    )[0],
+                    category_id=(
+                        self.random.choice(categories) if categories else None
+                    ),
+                    location_id=(
+                        self.random.choice(locations)
+                        if locations and self.random.random() < 0.7 else None
+                    ),
+                    **image,
+                )
+                if pub_date <= self.now:
+                    dated.append((pk, pub_date))
+                yield post
+
+        self.insert(Post, posts())
+        return dated
+
+    def make_comments(self, users, posts):
+        """Spread comments over past posts with a long-tailed distribution."""
+        count = self.options["comments"] if posts and users else 0
+        post_weights = list(accumulate(
+            self.random.paretovariate(SKEW) for _ in posts
+        ))
+        ids = self.next_ids(Comment, count)
+
+        def comments():
+            for pk in ids:
+                post_id, pub_date = self.random.choices(
+                    posts, cum_weights=post_weights
+                )[0]
+                age = (self.now - pub_date).total_seconds()
+                yield Comment(
+                    pk=pk,
+                    post_id=post_id,
+                    author_id=self.random.choice(users),
+                    text=self.fake.sentence(
+                        nb_words=self.random.randint(3, 30)
+                    ),
+                    is_published=not self.hidden(),
+                    created_at=pub_date + timedelta(
+                        seconds=self.random.uniform(0, age)
+                    ),
+                )
+
+        self.insert(Comment, comments())
+        return count
@@ -0,0 +1,266 @@
+from collections import Counter
+from datetime import datetime
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog import search
+from blog.dump import (
+    MODELS, NATURAL_KEYS, RENAMED_FIELDS, RENUMBERED_MODELS,
+    after_bulk_insert, get_model, keep_timestamps, read_records,
+)
+from blog.models import Comment, Post
+
+LABELS = list(MODELS.values())
+NAMES = {label: name for name, label in MODELS.items()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает пользователей, категории, местоположения, публикации и "
+        "комментарии из JSON Lines или JSON в формате db.json пачками "
+        "через bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="+",
+            help="Файлы .jsonl (по записи в строке) или .json (массив).",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Строк в одной вставке и одной транзакции.",
+        )
+        parser.add_argument(
+            "--defer-indexes", action="store_true",
+            help="Удалить индексы публикаций и комментариев на время "
+                 "загрузки и создать их заново в конце.",
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.verbosity = options["verbosity"]
+        # Source pk -> pk in this database, for rows matched by natural key.
+        self.ids = {label: {} for label in LABELS}
+        self.natural = {}
+        self.pending = {label: [] for label in LABELS}
+        self.created = Counter()
+        self.matched = Counter()
+        self.skipped = Counter()
+        self.started = perf_counter()
+
+        deferred = self.drop_indexes() if options["defer_indexes"] else []
+        try:
+            for path in options["paths"]:
+                for record in read_records(path):
+                    self.add(record)
+            self.flush(LABELS[-1])
+        except IntegrityError as e:
+            raise CommandError(
+                f"Конфликт при вставке ({e}); публикации и комментарии "
+                "сохраняют свои id, загружайте их в базу без этих записей."
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        finally:
+            self.create_indexes(deferred)
+            # Batches committed before an error stay; catch up on them too.
+            self.finish()
+        self.report()
+
+    def add(self, record):
+        label = record["model"].lower()
+        if label not in self.pending:
+            self.skipped[label] += 1
+            return
+        self.pending[label].append(record)
+        if len(self.pending[label]) >= self.batch_size:
+            self.flush(label)
+
+    def flush(self, upto):
+        """Insert pending rows of ``upto`` and of every model it refers to."""
+        for label in LABELS[:LABELS.index(upto) + 1]:
+            records, self.pending[label] = self.pending[label], []
+            if not records:
+                continue
+            objects = self.build(label, records)
+            with transaction.atomic(), keep_timestamps(get_model(label)):
+                if label in NATURAL_KEYS:
+                    self.insert_reference(label, objects)
+                elif label in RENUMBERED_MODELS:
+                    self.insert_renumbered(label, objects)
+                else:
+                    self.insert_content(label, objects)
+            if self.verbosity > 1:
+                self.progress()
+
+    def build(self, label, records):
+        """Unsaved ``(source pk, object)`` pairs with foreign keys resolved."""
+        model = get_model(label)
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
+        renamed = RENAMED_FIELDS.get(label, {})
+        rows = []
+        for record in records:
+            values = {
+                renamed.get(name, name): value
+                for name, value in record["fields"].items()
+            }
+            kwargs = {}
+            for field in fields:
+                if field.name not in values:
+                    if getattr(field, "auto_now_add", False):
+                        kwargs[field.attname] = timezone.now()
+                    continue
+                value = values[field.name]
+                if field.is_relation:
+                    target = field.related_model._meta.label_lower
+                    kwargs[field.attname] = self.ids[target].get(value, value)
+                    continue
+                value = field.to_python(value)
+                if (isinstance(value, datetime) and settings.USE_TZ
+                        and timezone.is_naive(value)):
+                    value = timezone.make_aware(value)
+                kwargs[field.attname] = value
+            if label == "auth.user" and not kwargs.get("password"):
+                kwargs["password"] = make_password(None)
+            rows.append((record["pk"], model(**kwargs)))
+        return self.drop_dangling(label, rows)
+
+    def drop_dangling(self, label, rows):
+        """Null or skip rows whose foreign keys point nowhere."""
+        model = get_model(label)
+        for field in model._meta.concrete_fields:
+            if not field.is_relation:
+                continue
+            wanted = {
+                getattr(obj, field.attname) for _, obj in rows
+            } - {None}
+            found = set(field.related_model.objects.filter(
+                pk__in=wanted
+            ).values_list("pk", flat=True))
+            kept = []
+            for pk, obj in rows:
+                value = getattr(obj, field.attname)
+                if value is None or value in found:
+                    kept.append((pk, obj))
+                elif field.null:
+                    setattr(obj, field.attname, None)
+                    kept.append((pk, obj))
+                else:
+                    self.skipped[label] += 1
+            rows = kept
+        return rows
+
+    def existing(self, label):
+        if label not in self.natural:
+            key = NATURAL_KEYS[label]
+            self.natural[label] = dict(
+                get_model(label).objects.order_by("-pk").values_list(
+                    key, "pk"
+                )
+            )
+        return self.natural[label]
+
+    def insert_reference(self, label, rows):
+        key = NATURAL_KEYS[label]
+        existing = self.existing(label)
+        new = {}
+        for pk, obj in rows:
+            value = getattr(obj, key)
+            if value in existing or value in new:
+                self.matched[label] += 1
+            else:
+                new[value] = obj
+        model = get_model(label)
+        model.objects.bulk_create(new.values())
+        # SQLite does not return ids from bulk_create, so read them back.
+        existing.update(model.objects.filter(
+            **{f"{key}__in": list(new)}
+        ).values_list(key, "pk"))
+        for pk, obj in rows:
+            self.ids[label][pk] = existing[getattr(obj, key)]
+        self.created[label] += len(new)
+
+    def insert_renumbered(self, label, rows):
+        model = get_model(label)
+        # Ids are handed out past the last one; the sequence is reset in
+        # finish().
+        last = model.objects.aggregate(last=Max("pk"))["last"] or 0
+        objects = []
+        for new_pk, (pk, obj) in enumerate(rows, start=last + 1):
+            obj.pk = new_pk
+            self.ids[label][pk] = new_pk
+            objects.append(obj)
+        model.objects.bulk_create(objects)
+        self.created[label] += len(objects)
+
+    def insert_content(self, label, rows):
+        objects = []
+        for pk, obj in rows:
+            obj.pk = pk
+            objects.append(obj)
+        get_model(label).objects.bulk_create(objects)
+        if label == "blog.post":
+            search.index_posts(
+                (post.pk, post.title, post.text) for post in objects
+            )
+        self.created[label] += len(objects)
+
+    def drop_indexes(self):
+        deferred = [
+            (model, index) for model in (Post, Comment)
+            for index in model._meta.indexes
+        ]
+        with connection.schema_editor() as editor:
+            for model, index in deferred:
+                editor.remove_index(model, index)
+        return deferred
+
+    def create_indexes(self, deferred):
+        if not deferred:
+            return
+        started = perf_counter()
+        with connection.schema_editor() as editor:
+            for model, index in deferred:
+                editor.add_index(model, index)
+        self.stderr.write(
+            f"Индексы созданы за {perf_counter() - started:.1f} с"
+        )
+
+    def finish(self):
+        after_bulk_insert([
+            get_model(label) for label in LABELS if self.created[label]
+        ])
+
+    def rate(self):
+        elapsed = perf_counter() - self.started
+        rows = sum(self.created.values()) + sum(self.matched.values())
+        return rows, elapsed, rows / elapsed if elapsed else 0
+
+    def progress(self):
+        rows, elapsed, rate = self.rate()
+        self.stderr.write(f"{rows} строк, {elapsed:.1f} с, {rate:.0f} строк/с")
+
+    def report(self):
+        for label in LABELS:
+            self.stdout.write(
+                f"{NAMES[label]}: создано {self.created[label]}, "
+                f"сопоставлено {self.matched[label]}, "
+                f"пропущено {self.skipped[label]}"
+            )
+        other = sorted(set(self.skipped) - set(LABELS))
+        if other:
+            self.stdout.write(f"Не загружались: {', '.join(other)}")
+        rows, elapsed, rate = self.rate()
+        self.stdout.write(self.style.SUCCESS(
+            f"Загружено {rows} строк за {elapsed:.1f} с "
+            f"({rate:.0f} строк/с)"
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import card_cache_stats, reset_card_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Показывает статистику кэша карточек публикаций."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Обнулить счётчики после вывода.",
+        )
+
+    def handle(self, *args, reset=False, **options):
+        stats = card_cache_stats()
+        total = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / total if total else 0
+        self.stdout.write(
+            f"Попаданий: {stats['hits']}, промахов: {stats['misses']}, "
+            f"доля попаданий: {ratio:.1%}"
+        )
+        if reset:
+            reset_card_cache_stats()
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.tasks import claim_next_task, run_task
+
+
+class Command(BaseCommand):
+    help = "Обрабатывает очередь изображений публикаций."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Завершиться, когда очередь опустеет.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Пауза между проверками пустой очереди, в секундах.",
+        )
+        parser.add_argument(
+            "--max-tasks",
+            type=int,
+            default=0,
+            help="Завершиться после указанного числа задач.",
+        )
+
+    def handle(self, *args, once=False, sleep=2.0, max_tasks=0, **options):
+        done = failed = 0
+        while not max_tasks or done + failed < max_tasks:
+            task = claim_next_task()
+            if task is None:
+                if once:
+                    break
+                time.sleep(sleep)
+                continue
+            if run_task(task):
+                done += 1
+            else:
+                failed += 1
+                self.stderr.write(
+                    f"Публикация {task.post_id}: {task.last_error}"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"Выполнено задач: {done}, с ошибкой: {failed}"
+        ))
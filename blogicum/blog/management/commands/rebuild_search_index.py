@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog import search
+
+
+class Command(BaseCommand):
+    help = "Заново строит поисковый индекс публикаций."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            indexed = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Проиндексировано публикаций: {indexed} "
+            f"(индекс: {search.backend()})"
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.cache import bump_version
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сохранённое количество комментариев у публикаций."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только сообщить о расхождениях, ничего не меняя.",
+        )
+
+    def handle(self, *args, check=False, **options):
+        stale = Post.objects.with_stale_comment_count().count()
+        if check:
+            self.stdout.write(f"Публикаций с неверным счётчиком: {stale}")
+            return
+        with transaction.atomic():
+            updated = Post.objects.recount_comments()
+        if stale:
+            # Counters were fixed with UPDATE, which sends no signals.
+            bump_version("post_card")
+            bump_version("feed")
+        self.stdout.write(self.style.SUCCESS(
+            f"Пересчитано публикаций: {updated}, исправлено: {stale}"
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Размеры оригинала и ширины созданных уменьшенных копий.', verbose_name='Копии фото'),
+        ),
+    ]
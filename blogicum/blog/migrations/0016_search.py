@@ -0,0 +1,103 @@
+# Generated by Django 3.2.16 on 2026-10-18 06:29
+
+import re
+from collections import Counter
+
+from django.db import migrations, models, utils
+import django.db.models.deletion
+import snowballstemmer
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, text)'
+            )
+    except utils.OperationalError:
+        # SQLite built without FTS5: blog.search falls back to SearchTerm.
+        pass
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+# Frozen copy of blog.search as of this migration: the migration must keep
+# building the same index whatever that module turns into later.
+WORD = re.compile(r'\w+')
+STOP_WORDS = frozenset(
+    'а б бы в во да до же за и из или к ко ли на над не ни но о об от по '
+    'под при про с со то у что это как так для'.split()
+)
+TITLE_WEIGHT = 2
+TERM_MAX_LENGTH = 64
+
+
+def _terms(text, stem_word):
+    words = WORD.findall(text.lower().replace('ё', 'е'))
+    return [
+        stem_word(word)[:TERM_MAX_LENGTH]
+        for word in words if word not in STOP_WORDS
+    ]
+
+
+def fill_search_index(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    SearchTerm = apps.get_model('blog', 'SearchTerm')
+    stem_word = snowballstemmer.stemmer('russian').stemWord
+    connection = schema_editor.connection
+    use_fts = FTS_TABLE in connection.introspection.table_names()
+    posts = Post.objects.values_list('pk', 'title', 'text').iterator()
+    for pk, title, text in posts:
+        title_terms = _terms(title, stem_word)
+        text_terms = _terms(text, stem_word)
+        if use_fts:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                    'VALUES (%s, %s, %s)',
+                    [pk, ' '.join(title_terms), ' '.join(text_terms)],
+                )
+            continue
+        weights = Counter(text_terms)
+        for term in title_terms:
+            weights[term] += TITLE_WEIGHT
+        SearchTerm.objects.bulk_create(
+            SearchTerm(post_id=pk, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Основа слова')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'элемент поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='search_term_post_uniq'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,60 @@
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from core.models import BigModel
+from . import images
+from .lookups import LookupIterable
+from .storage import get_post_image_storage
 from django.utils import timezone
 
 User = get_user_model()
 
 
+def _comment_count_subquery():
+    counts = Comment.objects.filter(
+        post=OuterRef("pk")
+    ).order_by().values("post").annotate(n=Count("pk")).values("n")
+    return Coalesce(Subquery(counts), 0)
+
+
+class PostQuerySet(models.QuerySet):
+    """Building blocks for the post feeds."""
+
+    def with_related(self):
+        """Join the author; category and location come from ``lookups``."""
+        queryset = self.select_related("author")
+        queryset._iterable_class = LookupIterable
+        return queryset
+
+    def published(self):
+        return self.filter(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now(),
+        )
+
+    def for_feed(self):
+        """Everything a post card needs, fetched in a single query."""
+        return self.with_related().order_by("-pub_date")
+
+    def visible(self):
+        """Public feed: published posts with joined relations."""
+        return self.for_feed().published()
+
+    def with_actual_comment_count(self):
+        return self.annotate(actual_comment_count=_comment_count_subquery())
+
+    def with_stale_comment_count(self):
+        return self.with_actual_comment_count().exclude(
+            comment_count=F("actual_comment_count")
+        )
+
+    def recount_comments(self):
+        """Rewrite ``comment_count`` from the comments table in one UPDATE."""
+        return self.update(comment_count=_comment_count_subquery())
+
+
 class Post(BigModel):
     title = models.CharField("Заголовок", max_length=256)
     text = models.TextField("Текст")
@@ -37,16 +86,89 @@ class Post(BigModel):
         verbose_name="Категория",
         related_name="post"
     )
-    image = models.ImageField('Фото', upload_to='posts_image', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='posts_image',
+        storage=get_post_image_storage,
+        blank=True,
+    )
+    image_renditions = models.JSONField(
+        "Копии фото",
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Размеры оригинала и ширины созданных уменьшенных копий.",
+    )
+    image_status = models.CharField(
+        "Обработка фото",
+        max_length=16,
+        choices=(
+            ("", "Нет фото"),
+            ("pending", "В очереди"),
+            ("ready", "Готово"),
+            ("failed", "Ошибка"),
+        ),
+        default="",
+        blank=True,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        "Количество комментариев",
+        default=0,
+        editable=False,
+        help_text="Поддерживается автоматически при добавлении и удалении "
+                  "комментариев.",
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         ordering = ("-pub_date", )
+        indexes = (
+            # Partial indexes cover the public feeds; the author's own
+            # profile also lists unpublished posts, so it gets a full one.
+            models.Index(
+                fields=("pub_date", "id"),
+                condition=models.Q(is_published=True),
+                name="post_feed_idx",
+            ),
+            models.Index(
+                fields=("category", "pub_date"),
+                condition=models.Q(is_published=True),
+                name="post_category_feed_idx",
+            ),
+            models.Index(
+                fields=("author", "pub_date"),
+                name="post_author_feed_idx",
+            ),
+            # The admin changelist sorts and drills down by date over all rows.
+            models.Index(fields=("pub_date", "id"), name="post_date_idx"),
+            # Files are shared between posts; this finds their references.
+            models.Index(fields=("image", ), name="post_image_idx"),
+        )
 
     def __str__(self):
         return self.title
 
+    @property
+    def image_srcset(self):
+        return images.srcset(self.image, self.image_renditions, "jpeg")
+
+    @property
+    def image_webp_srcset(self):
+        return images.srcset(self.image, self.image_renditions, "webp")
+
+    def is_visible(self):
+        """Same rules as ``PostQuerySet.published`` for a fetched post."""
+        return (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date <= timezone.now()
+        )
+
 
 class Category(BigModel):
     title = models.CharField("Заголовок", max_length=256)
@@ -98,6 +220,82 @@ class Comment(BigModel):
     class Meta:
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = (
+            models.Index(
+                fields=("post", "created_at"),
+                name="comment_post_created_idx",
+            ),
+        )
 
     def __str__(self):
         return self.text[:20] + '...' if len(self.text) > 20 else self.text
+
+
+class ImageTask(models.Model):
+    """Image processing job, taken by ``manage.py process_image_tasks``."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name="Публикация",
+        related_name="image_tasks"
+    )
+    status = models.CharField(
+        "Статус",
+        max_length=16,
+        choices=(
+            (PENDING, "В очереди"),
+            (RUNNING, "Выполняется"),
+            (DONE, "Выполнено"),
+            (FAILED, "Ошибка"),
+        ),
+        default=PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    run_after = models.DateTimeField("Не раньше", default=timezone.now)
+    locked_at = models.DateTimeField("Взята в работу", null=True, blank=True)
+    created_at = models.DateTimeField("Добавлено", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "задача обработки фото"
+        verbose_name_plural = "Задачи обработки фото"
+        indexes = (
+            models.Index(
+                fields=("status", "run_after"),
+                name="image_task_queue_idx",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.post_id}: {self.get_status_display()}"
+
+
+class SearchTerm(models.Model):
+    """Posting of the pure-Python search index, see ``blog.search``."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name="Публикация",
+        related_name="search_terms"
+    )
+    term = models.CharField("Основа слова", max_length=64)
+    weight = models.PositiveIntegerField("Вес", default=1)
+
+    class Meta:
+        verbose_name = "элемент поискового индекса"
+        verbose_name_plural = "Поисковый индекс"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("term", "post"), name="search_term_post_uniq"
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.term}: {self.post_id}"
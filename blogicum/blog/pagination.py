@@ -0,0 +1,173 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.paginator import InvalidPage, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .cache import cached_count
+
+# Planner statistics holding the row count of a table, per database vendor.
+ROW_ESTIMATE_SQL = {
+    "postgresql": "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+    "mysql": (
+        "SELECT table_rows FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = %s"
+    ),
+    # Filled in by ANALYZE; the first number of ``stat`` is the row count.
+    "sqlite": "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+}
+
+
+def estimate_row_count(model, using="default"):
+    """Row count of ``model``'s table from statistics, or None if unknown."""
+    connection = connections[using]
+    sql = ROW_ESTIMATE_SQL.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 does not exist until the first ANALYZE.
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(float(str(row[0]).split()[0]))
+    return estimate if estimate >= 0 else None
+
+
+class CursorPage:
+    """Page of a keyset-paginated feed; mimics the parts of Page we use."""
+
+    def __init__(self, object_list, paginator, after, next_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.after = after
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.after is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset paginator over ``(pub_date, id)``, newest first.
+
+    Every page is a single indexed range scan: no ``COUNT(*)`` and no
+    ``OFFSET``, so deep pages cost the same as the first one.
+    """
+
+    is_cursor = True
+    date_field = "pub_date"
+    descending = True
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list.order_by(*self.ordering)
+        self.per_page = int(per_page)
+
+    @property
+    def ordering(self):
+        prefix = "-" if self.descending else ""
+        return (prefix + self.date_field, prefix + "id")
+
+    def encode_cursor(self, obj):
+        raw = f"{getattr(obj, self.date_field).isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(token):
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            date, pk = raw.rsplit("|", 1)
+            date = parse_datetime(date)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise InvalidPage("Неверный курсор страницы.")
+        if date is None:
+            raise InvalidPage("Неверный курсор страницы.")
+        return date, pk
+
+    def page(self, after=None):
+        queryset = self.object_list
+        if after:
+            date, pk = self.decode_cursor(after)
+            beyond = "lt" if self.descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.date_field}__{beyond}": date})
+                | Q(**{self.date_field: date, f"pk__{beyond}": pk})
+            )
+        else:
+            after = None
+        # One extra row tells us whether a next page exists.
+        object_list = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+        return CursorPage(object_list, self, after, next_cursor)
+
+
+class CommentCursorPaginator(CursorPaginator):
+    """Comments of a post in ``(created_at, id)`` order, oldest first."""
+
+    date_field = "created_at"
+    descending = False
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids exact ``COUNT(*)`` over large result sets.
+
+    Up to ``BLOG_ESTIMATED_COUNT_THRESHOLD`` rows are counted exactly with
+    a count capped by ``LIMIT``. Above that, a whole table is sized from
+    planner statistics and anything else is counted once and cached for
+    ``BLOG_COUNT_CACHE_TIMEOUT`` seconds; ``is_estimate`` is then True.
+    """
+
+    is_cursor = False
+    is_estimate = False
+    # Longer page ranges are rendered as a window around the current page.
+    max_listed_pages = 10
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.is_sliced:
+            return super().count
+        threshold = settings.BLOG_ESTIMATED_COUNT_THRESHOLD
+        bounded = self.object_list[:threshold + 1].count()
+        if bounded <= threshold:
+            return bounded
+        self.is_estimate = True
+        if not query.where and not query.distinct:
+            estimate = estimate_row_count(
+                self.object_list.model, self.object_list.db
+            )
+            if estimate is not None:
+                return max(estimate, bounded)
+        return cached_count(
+            self.object_list, settings.BLOG_COUNT_CACHE_TIMEOUT
+        )
+
+    @property
+    def is_windowed(self):
+        return self.num_pages > self.max_listed_pages
@@ -0,0 +1,55 @@
+"""Deferred publications make the public feed change without any write.
+
+Every cache of the feed must expire no later than the earliest upcoming
+``pub_date``; the lookup uses ``post_feed_idx`` and its result is kept in
+the blog cache until that moment or until a post is written.
+"""
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import patch_response_headers, patch_vary_headers
+
+from .cache import after_commit, get_cache
+from .models import Post
+
+NEXT_PUBLICATION_KEY = "blog:next_publication"
+
+
+def next_publication():
+    """``pub_date`` of the earliest deferred post, or None."""
+    cache = get_cache()
+    now = timezone.now()
+    cached = cache.get(NEXT_PUBLICATION_KEY)
+    # An empty string records that nothing is scheduled.
+    if cached == "" or (cached is not None and cached > now):
+        return cached or None
+    upcoming = Post.objects.filter(
+        is_published=True, pub_date__gt=now
+    ).order_by("pub_date").values_list("pub_date", flat=True).first()
+    if upcoming is None:
+        cache.set(NEXT_PUBLICATION_KEY, "", settings.BLOG_PAGE_CACHE_TIMEOUT)
+    else:
+        timeout = max(int((upcoming - now).total_seconds()), 1)
+        cache.set(NEXT_PUBLICATION_KEY, upcoming, timeout)
+    return upcoming
+
+
+def forget_next_publication():
+    after_commit(lambda: get_cache().delete(NEXT_PUBLICATION_KEY))
+
+
+def publication_aware_timeout(timeout):
+    """``timeout`` in seconds, cut short at the next deferred publication."""
+    upcoming = next_publication()
+    if upcoming is None:
+        return timeout
+    seconds = int((upcoming - timezone.now()).total_seconds())
+    return max(min(timeout, seconds), 0)
+
+
+def patch_feed_cache_headers(response, timeout=None):
+    """Set ``Cache-Control: max-age`` and ``Expires`` on a public feed."""
+    if timeout is None:
+        timeout = settings.BLOG_FEED_MAX_AGE
+    patch_response_headers(response, publication_aware_timeout(timeout))
+    patch_vary_headers(response, ("Cookie", ))
+    return response
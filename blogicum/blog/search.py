@@ -0,0 +1,205 @@
+"""Full-text search over post titles and texts.
+
+Titles and texts are split into words and reduced to Russian stems here;
+the stems go into the ``blog_post_fts`` FTS5 table when SQLite provides
+one (ranked with bm25) or into ``SearchTerm`` rows otherwise (ranked by
+term weight and rarity). The post signals keep either index current.
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import (
+    Case, Count, F, FloatField, Q, Sum, Value, When
+)
+from django.db.models.expressions import RawSQL
+import snowballstemmer
+
+from .cache import cached_count
+from .models import Post, SearchTerm
+
+FTS_TABLE = "blog_post_fts"
+TITLE_WEIGHT = 2
+# Posts per DELETE ... IN and multi-row INSERT; below SQLite's 999
+# parameter limit.
+INDEX_BATCH_SIZE = 500
+WORD = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    "а б бы в во да до же за и из или к ко ли на над не ни но о об от по "
+    "под при про с со то у что это как так для".split()
+)
+_stem_word = snowballstemmer.stemmer("russian").stemWord
+
+
+@lru_cache(maxsize=10000)
+def stem(word):
+    return _stem_word(word)[:SearchTerm._meta.get_field("term").max_length]
+
+
+def terms(text):
+    """Stems of the words of ``text`` in order, stop words left out."""
+    words = WORD.findall(text.lower().replace("ё", "е"))
+    return [stem(word) for word in words if word not in STOP_WORDS]
+
+
+@lru_cache(maxsize=None)
+def has_fts_table():
+    return FTS_TABLE in connection.introspection.table_names()
+
+
+def backend():
+    """``"fts5"`` or ``"python"``; ``BLOG_SEARCH_BACKEND`` forces one."""
+    if settings.BLOG_SEARCH_BACKEND:
+        return settings.BLOG_SEARCH_BACKEND
+    return "fts5" if has_fts_table() else "python"
+
+
+def _weights(title, text):
+    weights = Counter(terms(text))
+    for term in terms(title):
+        weights[term] += TITLE_WEIGHT
+    return weights
+
+
+def index_posts(rows):
+    """Replace the indexed terms of ``(pk, title, text)`` rows in bulk."""
+    rows = list(rows)
+    for start in range(0, len(rows), INDEX_BATCH_SIZE):
+        batch = rows[start:start + INDEX_BATCH_SIZE]
+        pks = [pk for pk, _, _ in batch]
+        if backend() == "fts5":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {FTS_TABLE} WHERE rowid IN "
+                    f"({', '.join(['%s'] * len(pks))})",
+                    pks,
+                )
+                cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE} (rowid, title, text) "
+                    "VALUES (%s, %s, %s)",
+                    [
+                        (pk, " ".join(terms(title)), " ".join(terms(text)))
+                        for pk, title, text in batch
+                    ],
+                )
+            continue
+        SearchTerm.objects.filter(post_id__in=pks).delete()
+        SearchTerm.objects.bulk_create(
+            SearchTerm(post_id=pk, term=term, weight=weight)
+            for pk, title, text in batch
+            for term, weight in _weights(title, text).items()
+        )
+
+
+def index_post(pk, title, text):
+    """Replace the indexed terms of one post."""
+    index_posts([(pk, title, text)])
+
+
+def remove_post(pk):
+    if backend() == "fts5":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk]
+            )
+    else:
+        SearchTerm.objects.filter(post_id=pk).delete()
+
+
+def rebuild_index(posts=None):
+    """Index every post from scratch; returns the number indexed."""
+    if posts is None:
+        posts = Post.objects.all()
+    has_fts_table.cache_clear()
+    if backend() == "fts5":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    else:
+        SearchTerm.objects.all().delete()
+    indexed = 0
+    batch = []
+    for row in posts.values_list("pk", "title", "text").iterator():
+        batch.append(row)
+        if len(batch) == INDEX_BATCH_SIZE:
+            index_posts(batch)
+            indexed += len(batch)
+            batch = []
+    index_posts(batch)
+    return indexed + len(batch)
+
+
+def _query_words(query):
+    return list(dict.fromkeys(terms(query)))
+
+
+def _fts_match(words):
+    return " ".join(f'"{word}"' for word in words)
+
+
+def matching(query):
+    """``Q`` selecting posts that contain every word of ``query``, unranked."""
+    words = _query_words(query)
+    if not words:
+        return Q(pk__in=[])
+    if backend() == "fts5":
+        return Q(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+            (_fts_match(words), ),
+        ))
+    return Q(pk__in=SearchTerm.objects.filter(term__in=words).values(
+        "post"
+    ).annotate(matched=Count("pk")).filter(
+        matched=len(words)
+    ).values("post"))
+
+
+def search(queryset, query):
+    """Posts of ``queryset`` containing every word of ``query``.
+
+    The result is annotated with ``rank`` and ordered best match first.
+    """
+    words = _query_words(query)
+    if not words:
+        return queryset.none()
+    if backend() == "fts5":
+        match = _fts_match(words)
+        return queryset.filter(matching(query)).annotate(rank=RawSQL(
+            # bm25() is lower for better matches.
+            f"SELECT -bm25({FTS_TABLE}, {TITLE_WEIGHT}, 1) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s "
+            f"AND rowid = {Post._meta.db_table}.{Post._meta.pk.column}",
+            (match, ),
+            output_field=FloatField(),
+        )).order_by("-rank", "-pub_date")
+
+    frequencies = dict(
+        SearchTerm.objects.filter(term__in=words).values_list(
+            "term"
+        ).annotate(Count("pk")).order_by()
+    )
+    if len(frequencies) < len(words):
+        return queryset.none()
+    # Rarity only needs the rough size of the blog; a slightly stale count
+    # ranks the same.
+    total = max(
+        cached_count(Post.objects.all(), settings.BLOG_COUNT_CACHE_TIMEOUT),
+        *frequencies.values(),
+    )
+    rarity = Case(
+        *(
+            When(
+                search_terms__term=word,
+                then=Value(math.log(1 + total / frequencies[word])),
+            )
+            for word in words
+        ),
+        output_field=FloatField(),
+    )
+    return queryset.filter(search_terms__term__in=words).annotate(
+        matched=Count("search_terms"),
+        rank=Sum(F("search_terms__weight") * rarity,
+                 output_field=FloatField()),
+    ).filter(matched=len(words)).order_by("-rank", "-pub_date")
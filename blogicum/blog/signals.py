@@ -0,0 +1,174 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from . import images, search, tasks
+from .cache import bump_version
+from .models import Category, Comment, Location, Post
+from .schedule import forget_next_publication
+
+logger = logging.getLogger(__name__)
+
+# Posts being deleted right now; their comments go with them, so the
+# comment receivers have nothing to update.
+_deleting = threading.local()
+
+
+def _deleting_posts():
+    if not hasattr(_deleting, "posts"):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+def _shift_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F("comment_count") + delta
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _shift_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id not in _deleting_posts():
+        _shift_comment_count(instance.post_id, -1)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    _deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    _deleting_posts().discard(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    bump_version("post", instance.pk)
+    bump_version("feed")
+    forget_next_publication()
+
+
+@receiver(post_save, sender=Post)
+def post_indexed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {"title", "text"} & set(update_fields):
+        return
+    search.index_post(instance.pk, instance.title, instance.text)
+
+
+@receiver(post_delete, sender=Post)
+def post_unindexed(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    if instance.post_id in _deleting_posts():
+        return
+    bump_version("post", instance.post_id)
+    bump_version("feed")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_version("category", instance.pk)
+    bump_version("category")
+    bump_version("feed")
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(sender, instance, **kwargs):
+    bump_version("location", instance.pk)
+    bump_version("location")
+    bump_version("feed")
+
+
+@receiver(post_save, sender=get_user_model())
+def author_changed(sender, instance, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which no page displays.
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    bump_version("user", instance.pk)
+    bump_version("feed")
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image:
+        return
+    if images.is_current(instance.image, instance.image_renditions):
+        return
+    # A deduplicated file may already have renditions made for another post.
+    shared = Post.objects.filter(
+        image=instance.image.name, image_status="ready"
+    ).exclude(pk=instance.pk).values_list(
+        "image_renditions", flat=True
+    ).first()
+    if images.is_current(instance.image, shared):
+        instance.image_renditions = shared
+        instance.image_status = "ready"
+        Post.objects.filter(pk=instance.pk).update(
+            image_renditions=shared, image_status="ready"
+        )
+        return
+    if settings.BLOG_IMAGE_TASKS_EAGER:
+        tasks.process_image_inline(instance)
+        return
+    try:
+        tasks.enqueue_image_processing(instance)
+    except tasks.QueueFull:
+        # make_image_renditions processes these later.
+        logger.warning("Image queue is full, post %s skipped", instance.pk)
+        Post.objects.filter(pk=instance.pk).update(image_status="failed")
+
+
+def release_image(name, renditions, min_age=None):
+    """Delete a stored image once no post refers to it any more.
+
+    Files written or reused within ``min_age`` seconds (by default
+    BLOG_ORPHAN_IMAGE_MIN_AGE) are left to ``collect_orphan_images``: a
+    post that reuses the file may not have committed yet.
+    """
+    if not name or Post.objects.filter(image=name).exists():
+        return
+    if min_age is None:
+        min_age = settings.BLOG_ORPHAN_IMAGE_MIN_AGE
+    storage = Post._meta.get_field("image").storage
+    if storage.release(name, min_age):
+        images.delete_renditions(renditions, storage)
+
+
+@receiver(pre_save, sender=Post)
+def post_image_replaced(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    old = Post.objects.filter(pk=instance.pk).values_list(
+        "image", "image_renditions"
+    ).first()
+    if old and old[0] and old[0] != instance.image.name:
+        transaction.on_commit(lambda: release_image(*old))
+
+
+@receiver(post_delete, sender=Post)
+def post_image_deleted(sender, instance, **kwargs):
+    if instance.image:
+        name, renditions = instance.image.name, instance.image_renditions
+        transaction.on_commit(lambda: release_image(name, renditions))
@@ -0,0 +1,152 @@
+"""Sitemap index and chunked sitemaps of posts, categories and authors.
+
+Posts and authors are split into chunks by id range rather than by
+offset, so a chunk is one range scan and keeps its URL while the table
+grows. Chunks are streamed from ``.iterator()`` over plain tuples and
+the resulting XML is cached for one feed generation.
+"""
+import hashlib
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import ExpressionWrapper, F, IntegerField, Max
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+
+from .cache import feed_generation, get_cache
+from .lookups import categories
+from .models import Post
+from .schedule import publication_aware_timeout
+
+CONTENT_TYPE = "application/xml; charset=utf-8"
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+NAMESPACE = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _chunk_of(field):
+    return ExpressionWrapper(
+        F(field) / settings.BLOG_SITEMAP_CHUNK_SIZE,
+        output_field=IntegerField(),
+    )
+
+
+def _chunk_range(chunk):
+    size = settings.BLOG_SITEMAP_CHUNK_SIZE
+    return chunk * size, (chunk + 1) * size
+
+
+def _lastmod(value):
+    return f"<lastmod>{value.isoformat()}</lastmod>" if value else ""
+
+
+def _url(loc, lastmod=None):
+    return f"<url><loc>{escape(loc)}</loc>{_lastmod(lastmod)}</url>\n"
+
+
+def chunk_lastmods(field):
+    """``{chunk: latest pub_date}`` of visible posts grouped by ``field``."""
+    return dict(
+        Post.objects.visible().order_by().annotate(
+            chunk=_chunk_of(field)
+        ).values_list("chunk").annotate(lastmod=Max("pub_date"))
+    )
+
+
+def index_entries(request):
+    def sitemap(name, lastmod, **kwargs):
+        loc = request.build_absolute_uri(reverse(name, kwargs=kwargs))
+        return (
+            f"<sitemap><loc>{escape(loc)}</loc>{_lastmod(lastmod)}"
+            "</sitemap>\n"
+        )
+
+    post_lastmods = chunk_lastmods("id")
+    yield XML_HEADER + f"<sitemapindex {NAMESPACE}>\n"
+    for chunk, lastmod in sorted(post_lastmods.items()):
+        yield sitemap("blog:sitemap_posts", lastmod, chunk=chunk)
+    yield sitemap(
+        "blog:sitemap_categories", max(post_lastmods.values(), default=None)
+    )
+    for chunk, lastmod in sorted(chunk_lastmods("author_id").items()):
+        yield sitemap("blog:sitemap_profiles", lastmod, chunk=chunk)
+    yield "</sitemapindex>\n"
+
+
+def post_entries(request, chunk):
+    low, high = _chunk_range(chunk)
+    rows = Post.objects.visible().filter(
+        pk__gte=low, pk__lt=high
+    ).order_by("pk").values_list("pk", "pub_date")
+    yield XML_HEADER + f"<urlset {NAMESPACE}>\n"
+    for pk, pub_date in rows.iterator(chunk_size=2000):
+        loc = reverse("blog:post_detail", args=(pk, ))
+        yield _url(request.build_absolute_uri(loc), pub_date)
+    yield "</urlset>\n"
+
+
+def category_entries(request):
+    lastmods = dict(
+        Post.objects.visible().order_by().values_list(
+            "category_id"
+        ).annotate(lastmod=Max("pub_date"))
+    )
+    yield XML_HEADER + f"<urlset {NAMESPACE}>\n"
+    for category in categories.all():
+        if category.is_published:
+            loc = reverse("blog:category_posts", args=(category.slug, ))
+            yield _url(
+                request.build_absolute_uri(loc), lastmods.get(category.pk)
+            )
+    yield "</urlset>\n"
+
+
+def profile_entries(request, chunk):
+    low, high = _chunk_range(chunk)
+    rows = Post.objects.visible().filter(
+        author_id__gte=low, author_id__lt=high
+    ).order_by("author_id").values_list(
+        "author_id", "author__username"
+    ).annotate(lastmod=Max("pub_date"))
+    yield XML_HEADER + f"<urlset {NAMESPACE}>\n"
+    for _, username, lastmod in rows.iterator(chunk_size=2000):
+        loc = reverse("blog:profile", args=(username, ))
+        yield _url(request.build_absolute_uri(loc), lastmod)
+    yield "</urlset>\n"
+
+
+def cached_sitemap(entries):
+    """Stream ``entries`` on a cache miss, storing the result; else replay."""
+    def view(request, *args, **kwargs):
+        uri = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"blog:sitemap:{feed_generation()}:{uri}"
+        cache = get_cache()
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content, content_type=CONTENT_TYPE)
+
+        def stream():
+            parts, pending = [], []
+            for part in entries(request, *args, **kwargs):
+                pending.append(part.encode())
+                # Write in blocks rather than one tiny write per URL.
+                if len(pending) >= 500:
+                    parts.append(b"".join(pending))
+                    pending = []
+                    yield parts[-1]
+            parts.append(b"".join(pending))
+            yield parts[-1]
+            timeout = publication_aware_timeout(
+                settings.BLOG_PAGE_CACHE_TIMEOUT
+            )
+            if timeout > 0:
+                cache.set(key, b"".join(parts), timeout)
+
+        return StreamingHttpResponse(stream(), content_type=CONTENT_TYPE)
+
+    return view
+
+
+sitemap_index = cached_sitemap(index_entries)
+post_sitemap = cached_sitemap(post_entries)
+category_sitemap = cached_sitemap(category_entries)
+profile_sitemap = cached_sitemap(profile_entries)
@@ -0,0 +1,85 @@
+import hashlib
+import os
+import time
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+def content_hash(content):
+    """SHA-256 of a file, reusing the one computed during upload."""
+    known = getattr(content, "content_hash", None)
+    if known:
+        return known
+    hasher = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    content.seek(0)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that names files after their contents.
+
+    ``posts_image/photo.jpg`` is stored as ``posts_image/ab/<sha256>.jpg``;
+    saving the same bytes again returns the existing name without writing.
+    Derived files (renditions, rewritten originals) are stored the same
+    way, so a name never changes content and can be cached forever.
+
+    Reusing a file touches it (a claim), and ``release`` never deletes a
+    file claimed recently, so a deduplicated upload whose post has not
+    committed yet cannot lose its file to a concurrent cleanup.
+    """
+
+    def hashed_name(self, name, content):
+        dirname, basename = os.path.split(name)
+        digest = content_hash(content)
+        extension = os.path.splitext(basename)[1].lower()
+        return os.path.join(dirname, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        hashed = self.hashed_name(name, content)
+        if self.exists(hashed) and self.claim(hashed):
+            return hashed
+        return super().save(hashed, content, max_length=max_length)
+
+    def claim(self, name):
+        """Mark an existing file as in use; False if it is already gone."""
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release(self, name, min_age):
+        """Delete ``name`` unless it was written or claimed recently.
+
+        The file is first moved aside, so a claim either lands before the
+        move (and is seen in the mtime) or fails and makes the uploader
+        write the file again. Returns whether the file was deleted.
+        """
+        path = self.path(name)
+        released = f"{path}.released"
+        try:
+            os.replace(path, released)
+        except FileNotFoundError:
+            return False
+        if time.time() - os.stat(released).st_mtime < min_age:
+            # Same name, same bytes: safe even if the file was rewritten.
+            os.replace(released, path)
+            return False
+        os.remove(released)
+        return True
+
+
+post_image_storage = ContentAddressedStorage()
+
+
+def get_post_image_storage():
+    return post_image_storage
@@ -0,0 +1,138 @@
+"""Database-backed queue for work that must stay off the request path.
+
+Producers call ``enqueue_image_processing``; ``manage.py process_image_tasks``
+claims tasks one by one with a conditional UPDATE, so several workers can
+share the table without a broker.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import images
+from .cache import bump_version
+from .models import ImageTask, Post
+
+
+class QueueFull(Exception):
+    pass
+
+
+def queue_is_full():
+    return ImageTask.objects.filter(
+        status__in=(ImageTask.PENDING, ImageTask.RUNNING)
+    ).count() >= settings.BLOG_IMAGE_QUEUE_LIMIT
+
+
+def enqueue_image_processing(post):
+    """Queue derivative generation for ``post``; at most one pending task."""
+    Post.objects.filter(pk=post.pk).update(image_status="pending")
+    post.image_status = "pending"
+    if ImageTask.objects.filter(
+        post=post, status=ImageTask.PENDING
+    ).exists():
+        return
+    if queue_is_full():
+        raise QueueFull("Очередь обработки изображений переполнена.")
+    ImageTask.objects.create(post=post)
+
+
+def claim_next_task():
+    """Atomically take the oldest runnable task, or return None.
+
+    Tasks left ``running`` longer than the lease by a dead worker are
+    taken again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.BLOG_IMAGE_TASK_LEASE)
+    runnable = ImageTask.objects.filter(
+        Q(status=ImageTask.PENDING, run_after__lte=now)
+        | Q(status=ImageTask.RUNNING, locked_at__lt=stale)
+    ).order_by("run_after", "pk")
+    for task in runnable.only("pk", "status", "locked_at")[:5]:
+        claimed = ImageTask.objects.filter(
+            pk=task.pk, status=task.status, locked_at=task.locked_at
+        ).update(status=ImageTask.RUNNING, locked_at=now)
+        if claimed:
+            return ImageTask.objects.select_related("post").get(pk=task.pk)
+    return None
+
+
+def process_image(post):
+    """Normalize and render ``post.image``; returns the name it had before.
+
+    ``post.image`` is left pointing at the normalized file.
+    """
+    original = post.image.name
+    if not post.image:
+        return original, {}
+    post.image = images.normalize_original(post.image)
+    return original, images.make_renditions(post.image)
+
+
+def save_processed_image(post, original, renditions, started):
+    """Store the result of ``process_image``; False if the image changed.
+
+    ``started`` is the ``time.time()`` at which processing began.
+    """
+    # signals imports this module.
+    from .signals import release_image
+
+    updated = Post.objects.filter(pk=post.pk, image=original).update(
+        image=post.image.name,
+        image_renditions=renditions,
+        image_status="ready",
+    )
+    if updated and original != post.image.name:
+        # The replaced original still carries EXIF data, GPS included.
+        # Unless an identical upload claimed it since processing began,
+        # nothing is about to link to it.
+        transaction.on_commit(lambda: release_image(
+            original, {}, min_age=time.time() - started
+        ))
+    return bool(updated)
+
+
+def run_task(task):
+    """Run a claimed task; failures are retried with exponential backoff."""
+    post = task.post
+    started = time.time()
+    try:
+        original, renditions = process_image(post)
+    except Exception as e:
+        task.attempts += 1
+        task.last_error = f"{type(e).__name__}: {e}"
+        task.locked_at = None
+        if task.attempts < settings.BLOG_IMAGE_TASK_MAX_ATTEMPTS:
+            task.status = ImageTask.PENDING
+            task.run_after = timezone.now() + timedelta(
+                seconds=settings.BLOG_IMAGE_TASK_RETRY_DELAY
+                * 2 ** (task.attempts - 1)
+            )
+        else:
+            task.status = ImageTask.FAILED
+            Post.objects.filter(pk=post.pk).update(image_status="failed")
+        task.save()
+        return False
+    with transaction.atomic():
+        # The author may have replaced the image while we were working.
+        save_processed_image(post, original, renditions, started)
+        task.status = ImageTask.DONE
+        task.attempts += 1
+        task.locked_at = None
+        task.save()
+    bump_version("post", post.pk)
+    bump_version("feed")
+    return True
+
+
+def process_image_inline(post):
+    """Do the work in the current thread, bypassing the queue."""
+    started = time.time()
+    original, renditions = process_image(post)
+    save_processed_image(post, original, renditions, started)
+    post.image_renditions = renditions
+    post.image_status = "ready"
@@ -0,0 +1,34 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.cache import POST_CARD_TEMPLATE, render_post_card
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Render ``includes/post_card.html`` through the fragment cache."""
+    def render():
+        card = context.template.engine.get_template(POST_CARD_TEMPLATE)
+        with context.push(post=post):
+            return card.render(context)
+
+    return mark_safe(render_post_card(post, render))
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """Current query string with ``params`` replaced, e.g. ``page=2``."""
+    query = context["request"].GET.copy()
+    for name, value in params.items():
+        query[name] = value
+    return "?" + query.urlencode()
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side=2, on_ends=1):
+    """Page numbers around the current page, gaps marked with an ellipsis."""
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends
+    )
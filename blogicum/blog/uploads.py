@@ -0,0 +1,91 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    SkipFile, TemporaryFileUploadHandler
+)
+
+# Magic bytes and their offsets for the formats we accept from authors.
+IMAGE_SIGNATURES = (
+    ((b"\xff\xd8\xff", 0), ),
+    ((b"\x89PNG\r\n\x1a\n", 0), ),
+    ((b"GIF87a", 0), ),
+    ((b"GIF89a", 0), ),
+    ((b"RIFF", 0), (b"WEBP", 8)),
+)
+SNIFF_LENGTH = 12
+
+UPLOAD_ERRORS_ATTR = "_image_upload_errors"
+
+
+def upload_errors(request):
+    return getattr(request, UPLOAD_ERRORS_ATTR, {})
+
+
+def looks_like_image(header):
+    return any(
+        all(
+            header[offset:offset + len(magic)] == magic
+            for magic, offset in signature
+        )
+        for signature in IMAGE_SIGNATURES
+    )
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Stream image uploads to disk with early rejection and hashing.
+
+    Files larger than ``BLOG_IMAGE_MAX_UPLOAD_SIZE`` or not starting with
+    a known image signature are dropped as soon as that is known; the
+    reason is kept on the request for the form. Accepted files get a
+    ``content_hash`` attribute (SHA-256), computed while streaming.
+    """
+
+    request_too_large = False
+
+    def handle_raw_input(self, input_data, meta, content_length, boundary,
+                         encoding=None):
+        self.request_too_large = (
+            content_length is not None
+            and content_length > settings.BLOG_IMAGE_MAX_UPLOAD_SIZE
+            + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        )
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.received = 0
+        self.header = b""
+        if self.request_too_large:
+            self.reject("Файл слишком большой.")
+
+    def reject(self, message):
+        errors = getattr(self.request, UPLOAD_ERRORS_ATTR, {})
+        errors[self.field_name] = message
+        setattr(self.request, UPLOAD_ERRORS_ATTR, errors)
+        if hasattr(self, "file"):
+            self.file.close()
+        raise SkipFile
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.BLOG_IMAGE_MAX_UPLOAD_SIZE:
+            self.reject("Файл слишком большой.")
+        if len(self.header) < SNIFF_LENGTH:
+            self.header += raw_data[:SNIFF_LENGTH - len(self.header)]
+            if (
+                len(self.header) >= SNIFF_LENGTH
+                and not looks_like_image(self.header)
+            ):
+                self.reject("Загрузите изображение.")
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if len(self.header) < SNIFF_LENGTH and not looks_like_image(
+            self.header
+        ):
+            self.reject("Загрузите изображение.")
+        uploaded = super().file_complete(file_size)
+        uploaded.content_hash = self.hasher.hexdigest()
+        return uploaded
@@ -1,11 +1,12 @@
 from django.urls import path
-from . import views
+from . import api, feeds, sitemaps, views
 
 
 app_name = "blog"
 
 urlpatterns = [
     path("", views.PostListView.as_view(), name="index"),
+    path("search/", views.SearchView.as_view(), name="search"),
     path("posts/<int:post_id>/", views.PostDetailView.as_view(),
          name="post_detail"),
     path("posts/create/", views.PostCreateView.as_view(),
@@ -26,6 +27,8 @@ urlpatterns = [
          name="profile"),
     path("posts/<int:post_id>/comment/", views.add_comment,
          name="add_comment"),
+    path("posts/<int:post_id>/comments/", views.post_comments,
+         name="post_comments"),
     path(
         "posts/<int:post_id>/edit_comment/<int:comment_id>/",
         views.edit_comment,
@@ -37,5 +40,34 @@ urlpatterns = [
         "posts/<int:post_id>/delete_comment/<comment_id>/",
         views.delete_comment,
         name="delete_comment",
-    )
+    ),
+    path("sitemap.xml", sitemaps.sitemap_index, name="sitemap"),
+    path("sitemap-posts-<int:chunk>.xml", sitemaps.post_sitemap,
+         name="sitemap_posts"),
+    path("sitemap-categories.xml", sitemaps.category_sitemap,
+         name="sitemap_categories"),
+    path("sitemap-profiles-<int:chunk>.xml", sitemaps.profile_sitemap,
+         name="sitemap_profiles"),
+    path("feeds/rss/", feeds.cached_feed(feeds.PostFeed()), name="feed_rss"),
+    path("feeds/atom/", feeds.cached_feed(feeds.PostAtomFeed()),
+         name="feed_atom"),
+    path("feeds/category/<slug:category_slug>/rss/",
+         feeds.cached_feed(feeds.CategoryPostFeed()),
+         name="category_feed_rss"),
+    path("feeds/category/<slug:category_slug>/atom/",
+         feeds.cached_feed(feeds.CategoryPostAtomFeed()),
+         name="category_feed_atom"),
+    path("feeds/profile/<str:username>/rss/",
+         feeds.cached_feed(feeds.AuthorPostFeed()), name="author_feed_rss"),
+    path("feeds/profile/<str:username>/atom/",
+         feeds.cached_feed(feeds.AuthorPostAtomFeed()),
+         name="author_feed_atom"),
+    path("api/posts/", api.post_list, name="api_posts"),
+    path("api/posts/<int:post_id>/", api.post_detail, name="api_post"),
+    path("api/posts/<int:post_id>/comments/", api.comment_list,
+         name="api_comments"),
+    path("api/category/<slug:category_slug>/posts/",
+         api.category_post_list, name="api_category_posts"),
+    path("api/profile/<str:username>/posts/", api.profile_post_list,
+         name="api_profile_posts"),
 ]
@@ -1,5 +1,15 @@
+import hashlib
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
-from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.generic import (
     ListView,
     DetailView,
@@ -10,11 +20,40 @@ from django.views.generic import (
 from django.contrib.auth.models import User
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
 from django.contrib.auth.decorators import login_required
 
 from .models import Post, Category, Comment
+from .cache import (
+    cached_validators, get_cache, page_cache_key, store_page
+)
 from .forms import CommentForm
+from .lookups import categories
+from .schedule import patch_feed_cache_headers, publication_aware_timeout
+from .tasks import queue_is_full
+from .uploads import ImageUploadHandler, upload_errors
+from .pagination import (
+    CommentCursorPaginator, CursorPaginator, EstimatedCountPaginator
+)
+from .search import search
+
+
+def get_post_or_404(user, post_id):
+    """Post visible to ``user``: published ones, or any of their own."""
+    post = get_object_or_404(Post.objects.with_related(), pk=post_id)
+    if post.author != user and not post.is_visible():
+        raise Http404("Публикация не найдена.")
+    return post
+
+
+def comments_page(post, after=None):
+    paginator = CommentCursorPaginator(
+        post.comments.select_related("author"),
+        settings.BLOG_COMMENTS_PER_PAGE,
+    )
+    try:
+        return paginator.page(after)
+    except InvalidPage as e:
+        raise Http404(str(e))
 
 
 class PostMixin:
@@ -22,16 +61,105 @@ class PostMixin:
     model = Post
     ordering = "-pub_date"
     paginate_by = 10
+    paginator_class = EstimatedCountPaginator
 
     def get_queryset(self):
-        return Post.objects.filter(
-            is_published=True
-        ).annotate(
-            comment_count=Count('comments')
-        ).order_by(
-            self.ordering
+        return Post.objects.visible()
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get("after"))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class ConditionalGetMixin:
+    """Answer repeat GETs with 304 Not Modified.
+
+    Validators come from one aggregate query over the page's posts, cached
+    per feed generation, so an unchanged page costs no query at all. An
+    aggregate of ``{"missing": True}`` means the page is a 404 for this
+    user, which is answered before any 304.
+    """
+
+    def aggregate_validators(self):
+        return self.get_queryset().order_by().aggregate(
+            latest_pub_date=Max("pub_date"),
+            latest_created_at=Max("created_at"),
         )
 
+    def get_validators(self):
+        user = self.request.user
+        scope = "{}:{}:{}".format(
+            type(self).__name__, user.pk, sorted(self.kwargs.items())
+        )
+        generation, values = cached_validators(
+            scope,
+            self.aggregate_validators,
+            publication_aware_timeout(settings.BLOG_PAGE_CACHE_TIMEOUT),
+        )
+        if values.get("missing"):
+            raise Http404
+        # Generations are write timestamps in nanoseconds, so they also
+        # account for edits, which change neither created_at nor pub_date.
+        last_modified = max(
+            [int(generation // 10 ** 9)] + [
+                int(value.timestamp()) for value in values.values() if value
+            ]
+        )
+        # Pages with forms embed a token bound to the CSRF cookie.
+        csrf = user.is_authenticated and self.request.COOKIES.get(
+            settings.CSRF_COOKIE_NAME
+        )
+        etag = hashlib.md5("|".join(map(str, (
+            scope, generation, sorted(values.items()),
+            self.request.get_full_path(), csrf,
+        ))).encode()).hexdigest()
+        return quote_etag(etag), last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class AnonymousPageCacheMixin:
+    """Serve whole pages to anonymous visitors from the cache."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request)
+        cached = get_cache().get(key)
+        if cached is not None:
+            content, content_type = cached
+            return patch_feed_cache_headers(
+                HttpResponse(content, content_type=content_type)
+            )
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = publication_aware_timeout(
+                settings.BLOG_PAGE_CACHE_TIMEOUT
+            )
+            response.add_post_render_callback(
+                lambda rendered: store_page(key, rendered, timeout)
+            )
+            patch_feed_cache_headers(response)
+        return response
+
 
 class PostFormMixin:
     pk_url_kwarg = 'post_id'
@@ -39,24 +167,57 @@ class PostFormMixin:
     fields = ["title", "text", "pub_date", "location", "category", "image"]
     template_name = "blog/create.html"
 
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Upload handlers can only be swapped before request.POST is read,
+        # and CsrfViewMiddleware reads it; CSRF is checked in dispatch.
+        return csrf_exempt(super().as_view(**initkwargs))
 
-class PostListView(PostMixin, ListView):
-    template_name = "blog/index.html"
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
 
-    def get_queryset(self):
-        return super().get_queryset().filter(category__is_published=True,
-                                             pub_date__lte=timezone.now())
+    def add_upload_errors(self, form):
+        for field, message in upload_errors(self.request).items():
+            form.add_error(field, message)
+
+    def form_invalid(self, form):
+        self.add_upload_errors(form)
+        return super().form_invalid(form)
+
+    def form_valid(self, form):
+        if upload_errors(self.request):
+            return self.form_invalid(form)
+        # Back-pressure: refuse new images instead of growing the queue.
+        if (
+            "image" in form.changed_data
+            and form.cleaned_data.get("image")
+            and not settings.BLOG_IMAGE_TASKS_EAGER
+            and queue_is_full()
+        ):
+            form.add_error(
+                "image",
+                "Сервер обрабатывает слишком много изображений, "
+                "попробуйте позже.",
+            )
+            return self.form_invalid(form)
+        return super().form_valid(form)
+
+
+class PostListView(ConditionalGetMixin, AnonymousPageCacheMixin, PostMixin,
+                   ListView):
+    template_name = "blog/index.html"
 
 
-class CategoryPostListView(PostMixin, ListView):
+class CategoryPostListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                           PostMixin, ListView):
     template_name = "blog/category.html"
 
     def get_queryset(self):
-        self.category = get_object_or_404(
-            Category, slug=self.kwargs["category_slug"], is_published=True
-        )
-        return super().get_queryset().filter(category=self.category.pk,
-                                             pub_date__lte=timezone.now())
+        self.category = categories.get_by_slug(self.kwargs["category_slug"])
+        if self.category is None or not self.category.is_published:
+            raise Http404("Категория не найдена.")
+        return super().get_queryset().filter(category=self.category.pk)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -64,40 +225,80 @@ class CategoryPostListView(PostMixin, ListView):
         return context
 
 
-class PostDetailView(PostMixin, DetailView):
-    template_name = "blog/detail.html"
+class SearchView(AnonymousPageCacheMixin, PostMixin, ListView):
+    template_name = "blog/search.html"
 
     def get_queryset(self):
-        post = get_object_or_404(Post, pk=self.kwargs["post_id"])
-        if self.request.user == post.author:
-            return Post.objects.filter(author=self.request.user)
-        return super().get_queryset().filter(category__is_published=True,
-                                             pub_date__lte=timezone.now())
+        self.query = self.request.GET.get("q", "").strip()
+        return search(super().get_queryset(), self.query)
+
+    def paginate_queryset(self, queryset, page_size):
+        # Results are ranked, so keyset pagination by date does not apply.
+        return super(PostMixin, self).paginate_queryset(queryset, page_size)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.query
+        return context
+
+
+class PostDetailView(ConditionalGetMixin, PostMixin, DetailView):
+    template_name = "blog/detail.html"
+
+    def aggregate_validators(self):
+        # Same rule as get_post_or_404: published, or the reader's own.
+        posts = Post.objects.filter(pk=self.kwargs[self.pk_url_kwarg])
+        values = (
+            posts.published() | posts.filter(author=self.request.user.pk)
+        ).aggregate(
+            found=Max("pk"),
+            latest_pub_date=Max("pub_date"),
+            latest_created_at=Max("created_at"),
+            latest_comment_at=Max("comments__created_at"),
+        )
+        if values.pop("found") is None:
+            return {"missing": True}
+        return values
+
+    def get_object(self, queryset=None):
+        return get_post_or_404(
+            self.request.user, self.kwargs[self.pk_url_kwarg]
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = Comment.objects.filter(
-            post=self.get_object()).order_by(
-            "created_at"
+        context["comments"] = comments_page(
+            self.object, self.request.GET.get("after")
         )
         return context
 
 
+def post_comments(request, post_id):
+    """Next batch of rendered comments, loaded by the detail page."""
+    post = get_post_or_404(request.user, post_id)
+    context = {
+        "post": post,
+        "comments": comments_page(post, request.GET.get("after")),
+    }
+    return render(request, "includes/comment_list.html", context)
+
+
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.with_related(), pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.post = post
         comment.author = request.user
-        comment.save()
+        with transaction.atomic():
+            comment.save()
         return redirect("blog:post_detail", post_id=post_id)
     context = {
         "post": post,
         "form": form,
-        "comments": Comment.objects.filter(post=post).order_by("created_at")
+        "comments": comments_page(post),
     }
     return render(request, "blog/detail.html", context)
 
@@ -121,22 +322,22 @@ def edit_comment(request, post_id, comment_id):
                   {'form': form, 'comment': comment})
 
 
-class UserPostListView(PostMixin, ListView):
+class UserPostListView(ConditionalGetMixin, PostMixin, ListView):
     template_name = "blog/profile.html"
 
+    @cached_property
+    def profile(self):
+        # Needed by both the validators and the page.
+        return get_object_or_404(User, username=self.kwargs["username"])
+
     def get_queryset(self):
-        self.user = get_object_or_404(User, username=self.kwargs["username"])
-        if self.request.user == self.user:
-            return Post.objects.filter(author=self.user)
-        return super().get_queryset().filter(
-            author=self.user,
-            category__is_published=True,
-            pub_date__lte=timezone.now()
-        ).order_by(self.ordering)
+        if self.request.user == self.profile:
+            return Post.objects.for_feed().filter(author=self.profile)
+        return super().get_queryset().filter(author=self.profile)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["profile"] = self.user
+        context["profile"] = self.profile
         return context
 
 
@@ -190,7 +391,8 @@ def delete_comment(request, post_id, comment_id):
     if request.method == 'GET':
         return render(request, "blog/comment.html", {"comment": comment})
     else:
-        Comment.objects.get(pk=comment_id).delete()
+        with transaction.atomic():
+            comment.delete()
         return redirect("blog:post_detail", post_id=post_id)
 
 
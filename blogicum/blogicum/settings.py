@@ -89,6 +89,25 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Cache versions and invalidations must be seen by every worker process.
+# The per-process LocMemCache below is for development with a single
+# process (runserver); deployments with several workers must point
+# 'default' at a shared backend such as Memcached or Redis. Versions
+# start from the clock, so evicting them only costs cache misses.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -146,6 +165,88 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 MEDIA_URL = '/media/'
 
+# Browser cache lifetime for media files whose names are not content
+# hashes; hashed names are always cached for a year.
+MEDIA_MAX_AGE = 60 * 60
+
+# Internal location the front proxy serves MEDIA_ROOT from, e.g.
+# '/protected-media/'. When set, media responses carry X-Accel-Redirect
+# and no body; leave None to stream files from Django.
+MEDIA_ACCEL_REDIRECT = None
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Keyset pagination for the post feeds: pages are addressed with opaque
+# ``?after=`` tokens instead of ``?page=`` numbers and no COUNT is run.
+BLOG_CURSOR_PAGINATION = False
+
+# Cache used for rendered post cards and other blog fragments.
+BLOG_CACHE_ALIAS = 'default'
+
+BLOG_POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Upper bound for anonymous feed pages; entries expire earlier when a
+# deferred post is due, and are dropped by any write once it commits. The
+# feed generation lives in BLOG_CACHE_ALIAS, which every worker must share.
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Longest time a process keeps its in-memory copy of categories and
+# locations, in seconds. Writes through the models reload it sooner; this
+# bounds staleness after queryset updates and raw SQL.
+BLOG_LOOKUP_TTL = 60
+
+# Browser/proxy max-age for anonymous feed pages, also cut short at the
+# next deferred publication.
+BLOG_FEED_MAX_AGE = 60
+
+# Widths of the resized copies made for every uploaded post image.
+BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+
+# Image processing queue (``manage.py process_image_tasks``). With EAGER
+# on, images are processed in the request thread instead.
+BLOG_IMAGE_TASKS_EAGER = False
+
+BLOG_IMAGE_QUEUE_LIMIT = 500
+
+BLOG_IMAGE_TASK_MAX_ATTEMPTS = 5
+
+BLOG_IMAGE_TASK_RETRY_DELAY = 30
+
+BLOG_IMAGE_TASK_LEASE = 60 * 10
+
+# Unreferenced post images younger than this (written, or reused by an
+# identical upload) are kept, in seconds: the post that uses them may not
+# have committed yet. collect_orphan_images removes them later.
+BLOG_ORPHAN_IMAGE_MIN_AGE = 60 * 60
+
+# Post images larger than this are dropped while streaming, in bytes.
+BLOG_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+
+# Search index: 'fts5' (SQLite FTS5 table), 'python' (SearchTerm rows) or
+# None to use FTS5 whenever the table exists. Run rebuild_search_index
+# after switching.
+BLOG_SEARCH_BACKEND = None
+
+# Paginated result sets larger than this are not counted exactly: whole
+# tables are sized from planner statistics, other querysets get a count
+# cached for BLOG_COUNT_CACHE_TIMEOUT.
+BLOG_ESTIMATED_COUNT_THRESHOLD = 10000
+
+# How long counts of large filtered result sets are reused, in seconds.
+BLOG_COUNT_CACHE_TIMEOUT = 60 * 5
+
+# Comments shown on a post page at once; the rest load on demand.
+BLOG_COMMENTS_PER_PAGE = 20
+
+# Default and largest ?limit= of the JSON API lists.
+BLOG_API_PAGE_SIZE = 20
+
+BLOG_API_MAX_PAGE_SIZE = 100
+
+# Number of latest posts in every RSS/Atom feed.
+BLOG_SYNDICATION_ITEMS = 20
+
+# Ids per sitemap chunk; the protocol allows up to 50 000 URLs per file.
+BLOG_SITEMAP_CHUNK_SIZE = 10000
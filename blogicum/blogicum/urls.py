@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.urls import include, path, reverse_lazy
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
-from django.conf.urls.static import static
+from core.views import serve_media
 import blogicum.settings as settings
 
 urlpatterns = [
@@ -19,7 +19,12 @@ urlpatterns = [
         ),
         name="registration",
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        settings.MEDIA_URL.lstrip("/") + "<path:path>",
+        serve_media,
+        name="media",
+    ),
+]
 
 handler404 = "pages.views.page_not_found"
 handler500 = "pages.views.server_error"
@@ -0,0 +1,134 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotAllowed
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+# ``ab/<sha256>.jpg`` and its renditions ``ab/<sha256>_640w.webp``.
+HASHED_NAME = re.compile(r"(^|/)[0-9a-f]{64}(_\d+w)?\.\w+$")
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+BLOCK_SIZE = 64 * 1024
+
+
+class _FileRange:
+    """Read-only view of ``length`` bytes of an open file."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """``(start, end)`` of a single ``bytes=`` range, inclusive.
+
+    Returns None for headers we do not handle (several ranges, other
+    units), which means the whole file is sent; raises ValueError when
+    the range lies outside the file.
+    """
+    match = RANGE.match(header.replace(" ", ""))
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def serve_media(request, path):
+    """Serve a file from ``MEDIA_ROOT`` the way a static file server would.
+
+    Whole files go out through ``wsgi.file_wrapper`` (``sendfile`` under
+    most servers), single byte ranges are honoured and content-hashed
+    names are cached for a year. With ``MEDIA_ACCEL_REDIRECT`` set, the
+    body is left to the front proxy via ``X-Accel-Redirect``.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(("GET", "HEAD"))
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        stats = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404
+    if not stat.S_ISREG(stats.st_mode):
+        raise Http404
+    etag = quote_etag(f"{stats.st_mtime_ns:x}-{stats.st_size:x}")
+    last_modified = int(stats.st_mtime)
+    if HASHED_NAME.search(path):
+        cache_control = IMMUTABLE
+    else:
+        cache_control = f"public, max-age={settings.MEDIA_MAX_AGE}"
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = _file_response(request, path, fullpath, stats.st_size,
+                                  etag)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = cache_control
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _file_response(request, path, fullpath, size, etag):
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or "application/octet-stream"
+    if settings.MEDIA_ACCEL_REDIRECT:
+        # The proxy handles Range itself; we only authorise the request.
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_REDIRECT + path
+        return response
+
+    byte_range = None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if "HTTP_RANGE" in request.META and if_range in (None, etag):
+        try:
+            byte_range = parse_range(request.META["HTTP_RANGE"], size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(fullpath, "rb"),
+                                content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(
+            _FileRange(open(fullpath, "rb"), start, length),
+            status=206, content_type=content_type,
+        )
+        response.block_size = BLOCK_SIZE
+        response["Content-Length"] = length
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if encoding:
+        response["Content-Encoding"] = encoding
+    return response
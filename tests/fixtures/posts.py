@@ -97,6 +97,26 @@ def post_with_published_location(
     return post
 
 
+@pytest.fixture
+def blend_visible_posts(mixer: Mixer):
+    """Make ``n`` posts shown in the feeds; keyword arguments override."""
+    def blend(n=1, **kwargs):
+        params = dict(
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+            category__is_published=True,
+            location__is_published=True,
+        )
+        params.update(kwargs)
+        return mixer.cycle(n).blend("blog.Post", **params)
+    return blend
+
+
+@pytest.fixture
+def visible_post(blend_visible_posts):
+    return blend_visible_posts()[0]
+
+
 @pytest.fixture
 def many_posts_with_published_locations(
     mixer: Mixer, user, published_locations, published_category
@@ -0,0 +1,83 @@
+import pytest
+from django.core import checks
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from blog.pagination import EstimatedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELIST = "/admin/blog/post/"
+
+
+def _count_queries(client: Client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+def test_admin_configuration_passes_checks():
+    errors = checks.run_checks(tags=[checks.Tags.admin])
+    assert not errors, errors
+
+
+def test_post_changelist_query_count(
+        admin_client: Client, blend_visible_posts
+):
+    blend_visible_posts(2)
+    few = _count_queries(admin_client, CHANGELIST)
+    blend_visible_posts(10)
+    assert _count_queries(admin_client, CHANGELIST) == few, (
+        "Убедитесь, что список публикаций в админке загружает автора, "
+        "категорию и местоположение одним запросом."
+    )
+
+
+def test_post_admin_search(
+        mixer: Mixer, admin_client: Client, blend_visible_posts
+):
+    author = mixer.blend("auth.User", username="pushkin")
+    # Fixed texts: random ones may contain the searched words.
+    by_author = blend_visible_posts(
+        author=author, title="Осень", text="Текст"
+    )[0]
+    by_word = blend_visible_posts(title="Стихи про осень", text="Текст")[0]
+    blend_visible_posts(title="Зима", text="Текст")
+
+    response = admin_client.get(CHANGELIST, {"q": "push"})
+    assert list(response.context["cl"].result_list) == [by_author], (
+        "Убедитесь, что поиск в админке находит публикации по началу "
+        "имени автора."
+    )
+    response = admin_client.get(CHANGELIST, {"q": "осени"})
+    assert set(response.context["cl"].result_list) == {by_author, by_word}, (
+        "Убедитесь, что поиск в админке использует поисковый индекс."
+    )
+
+
+def test_estimated_count_for_whole_table(settings, blend_visible_posts):
+    if connection.vendor != "sqlite":
+        pytest.skip("Статистика таблиц проверяется на SQLite.")
+    settings.BLOG_ESTIMATED_COUNT_THRESHOLD = 2
+    blend_visible_posts(3)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    blend_visible_posts(2, is_published=False)
+
+    paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+    assert paginator.count == 3, (
+        "Убедитесь, что для всей таблицы используется оценка количества "
+        "строк из статистики."
+    )
+    assert paginator.is_estimate
+
+    settings.BLOG_ESTIMATED_COUNT_THRESHOLD = 100
+    paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+    assert paginator.count == 5, (
+        "Убедитесь, что небольшие таблицы считаются точно."
+    )
+    assert not paginator.is_estimate
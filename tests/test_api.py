@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get(client: Client, url, status=200, **params):
+    response = client.get(url, params)
+    assert response.status_code == status, response.content
+    assert response["Content-Type"] == "application/json"
+    return response.json()
+
+
+def test_api_feed_follows_cursor(client: Client, blend_visible_posts):
+    posts = blend_visible_posts(3)
+    blend_visible_posts(is_published=False)
+    data = _get(client, "/api/posts/", limit=2)
+    assert [p["id"] for p in data["results"]] == [
+        post.id for post in sorted(posts, key=lambda p: p.id, reverse=True)
+    ][:2], "Убедитесь, что API отдаёт опубликованные записи, новые первыми."
+    assert data["next"]
+    rest = _get(client, data["next"])
+    assert len(rest["results"]) == 1
+    assert rest["next"] is None
+
+
+def test_api_sparse_fieldsets(client: Client, visible_post):
+    post = visible_post
+    data = _get(client, "/api/posts/", fields="id,title,category")
+    assert data["results"] == [{
+        "id": post.id,
+        "title": post.title,
+        "category": {
+            "slug": post.category.slug, "title": post.category.title
+        },
+    }], "Убедитесь, что параметр fields ограничивает набор полей."
+    error = _get(client, "/api/posts/", status=400, fields="id,secret")
+    assert "secret" in error["error"]
+
+
+def test_api_visibility(
+        mixer: Mixer, client: Client, user_client, user, blend_visible_posts
+):
+    hidden = blend_visible_posts(is_published=False, author=user)[0]
+    _get(client, f"/api/posts/{hidden.id}/", status=404)
+    _get(client, f"/api/posts/{hidden.id}/comments/", status=404)
+    assert _get(user_client, f"/api/posts/{hidden.id}/")["id"] == hidden.id
+    assert _get(client, f"/api/profile/{user.username}/posts/")[
+        "results"
+    ] == []
+    own = _get(user_client, f"/api/profile/{user.username}/posts/")
+    assert [p["id"] for p in own["results"]] == [hidden.id], (
+        "Убедитесь, что автор видит в API свои неопубликованные записи."
+    )
+    category = mixer.blend("blog.Category", is_published=False)
+    _get(client, f"/api/category/{category.slug}/posts/", status=404)
+
+
+def test_api_comments(mixer: Mixer, client: Client, visible_post):
+    post = visible_post
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    data = _get(
+        client, f"/api/posts/{post.id}/comments/", limit=2, fields="id"
+    )
+    assert data["results"] == [{"id": c.id} for c in comments[:2]]
+    data = _get(client, data["next"])
+    assert data["results"] == [{"id": comments[2].id}], (
+        "Убедитесь, что ссылка на следующую страницу сохраняет параметры."
+    )
+    data = _get(client, f"/api/posts/{post.id}/comments/")
+    assert data["results"][0]["text"] == comments[0].text
+
+
+@pytest.mark.parametrize("url", [
+    "/api/posts/",
+    "/api/category/{category}/posts/",
+    "/api/profile/{author}/posts/",
+])
+def test_api_query_count_is_constant(
+        mixer: Mixer, client: Client, url, blend_visible_posts
+):
+    author = mixer.blend("auth.User")
+    category = mixer.blend("blog.Category", is_published=True)
+    blend_visible_posts(2, author=author, category=category)
+    url = url.format(category=category.slug, author=author.username)
+
+    def count():
+        client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(url)
+        return len(ctx.captured_queries)
+
+    few = count()
+    blend_visible_posts(10, author=author, category=category)
+    assert count() == few, (
+        f"Убедитесь, что число запросов к `{url}` не зависит от числа "
+        "записей."
+    )
@@ -0,0 +1,80 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.cache import feed_generation
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _stored_count(post) -> int:
+    return Post.objects.values_list("comment_count", flat=True).get(
+        pk=post.pk
+    )
+
+
+def test_comment_count_follows_views(
+        user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    for _ in range(2):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": "Текст"})
+    assert _stored_count(post) == 2, (
+        "Убедитесь, что при добавлении комментария увеличивается сохранённый"
+        " счётчик комментариев публикации."
+    )
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert _stored_count(post) == 1, (
+        "Убедитесь, что при удалении комментария уменьшается сохранённый"
+        " счётчик комментариев публикации."
+    )
+
+
+def test_comment_count_follows_bulk_delete(
+        mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(Comment, post=post)
+    Comment.objects.filter(post=post).delete()
+    assert _stored_count(post) == 0
+
+
+def test_post_delete_skips_comment_counters(
+        mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(Comment, post=post)
+    with CaptureQueriesContext(connection) as ctx:
+        post.delete()
+    assert not any(
+        q["sql"].startswith('UPDATE "blog_post"') for q in ctx.captured_queries
+    ), (
+        "Убедитесь, что при удалении публикации счётчик не обновляется для "
+        "каждого её комментария."
+    )
+    assert not Comment.objects.exists()
+
+
+def test_recount_comments_command(
+        mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend(Comment, post=post)
+    Post.objects.update(comment_count=42)
+    out = StringIO()
+    call_command("recount_comments", "--check", stdout=out)
+    assert "1" in out.getvalue()
+    assert _stored_count(post) == 42
+    generation = feed_generation()
+    call_command("recount_comments", stdout=StringIO())
+    assert _stored_count(post) == 3
+    assert feed_generation() != generation, (
+        "Убедитесь, что после пересчёта сбрасывается кеш страниц."
+    )
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _blend_comments(mixer: Mixer, post, n: int):
+    return mixer.cycle(n).blend("blog.Comment", post=post)
+
+
+def _texts(comments):
+    return [comment.text for comment in comments]
+
+
+def test_detail_page_shows_first_comments(
+        mixer: Mixer, client: Client, visible_post, settings
+):
+    settings.BLOG_COMMENTS_PER_PAGE = 3
+    comments = _blend_comments(mixer, visible_post, 7)
+    response = client.get(f"/posts/{visible_post.id}/")
+    page = response.context["comments"]
+    assert _texts(page) == _texts(comments[:3]), (
+        "Убедитесь, что на странице публикации выводятся только первые "
+        "комментарии, от старых к новым."
+    )
+    assert page.has_next()
+    fragment_url = f"/posts/{visible_post.id}/comments/"
+    assert f"{fragment_url}?after=" in response.content.decode()
+
+    response = client.get(fragment_url, {"after": page.next_cursor})
+    assert response.status_code == 200, (
+        "Убедитесь, что следующие комментарии доступны по адресу "
+        "`/posts/<post_id>/comments/`."
+    )
+    assert "<html" not in response.content.decode()
+    page = response.context["comments"]
+    assert _texts(page) == _texts(comments[3:6])
+
+    response = client.get(fragment_url, {"after": page.next_cursor})
+    assert _texts(response.context["comments"]) == _texts(comments[6:])
+    assert not response.context["comments"].has_next()
+
+
+def test_detail_query_count_does_not_depend_on_comments(
+        mixer: Mixer, user_client: Client, visible_post, settings
+):
+    settings.BLOG_COMMENTS_PER_PAGE = 3
+    _blend_comments(mixer, visible_post, 2)
+
+    def count():
+        user_client.get(f"/posts/{visible_post.id}/")
+        with CaptureQueriesContext(connection) as ctx:
+            user_client.get(f"/posts/{visible_post.id}/")
+        return len(ctx.captured_queries)
+
+    few = count()
+    _blend_comments(mixer, visible_post, 10)
+    assert count() == few
+
+
+def test_comment_fragment_errors(mixer: Mixer, client: Client, visible_post):
+    response = client.get(
+        f"/posts/{visible_post.id}/comments/", {"after": "bad"}
+    )
+    assert response.status_code == 404
+    hidden = mixer.blend("blog.Post", is_published=False)
+    assert client.get(f"/posts/{hidden.id}/comments/").status_code == 404, (
+        "Убедитесь, что комментарии скрытой публикации недоступны."
+    )
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _urls(post):
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+
+
+@pytest.mark.parametrize("client_fixture", ["unlogged_client", "user_client"])
+def test_repeat_get_is_not_modified(
+        request, client_fixture, post_with_published_location
+):
+    client: Client = request.getfixturevalue(client_fixture)
+    for url in _urls(post_with_published_location):
+        # The first visit may set the CSRF cookie, which is part of the ETag.
+        client.get(url)
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header("ETag") and response.has_header(
+            "Last-Modified"
+        ), f"Убедитесь, что страница `{url}` отдаёт ETag и Last-Modified."
+        repeat = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert repeat.status_code == 304, (
+            f"Убедитесь, что повторный запрос страницы `{url}` с тем же ETag"
+            " получает ответ 304."
+        )
+        assert not repeat.content
+
+
+def test_etag_changes_after_edit(
+        client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    etags = {url: client.get(url)["ETag"] for url in _urls(post)}
+    post.title = "Изменённый заголовок"
+    post.save()
+    for url, etag in etags.items():
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что после изменения публикации страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+def test_etag_differs_per_user(
+        user_client: Client, another_user_client: Client,
+        post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = user_client.get(url)["ETag"]
+    assert another_user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
+
+
+def _future():
+    return http_date((timezone.now() + timedelta(days=365)).timestamp())
+
+
+def test_missing_post_is_404_with_conditional_headers(client: Client):
+    response = client.get(
+        "/posts/999999/", HTTP_IF_MODIFIED_SINCE=_future(),
+        HTTP_IF_NONE_MATCH="*",
+    )
+    assert response.status_code == 404, (
+        "Убедитесь, что несуществующая публикация отдаёт 404, а не 304."
+    )
+
+
+def test_hidden_post_is_404_with_conditional_headers(
+        client: Client, user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/"
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=_future())
+    assert response.status_code == 404, (
+        "Убедитесь, что скрытая публикация отдаёт 404 и при условном запросе."
+    )
+    assert "ETag" not in response
+    # The author still sees the post and gets 304 for it; the first visit
+    # sets the CSRF cookie, which is part of the ETag.
+    user_client.get(url)
+    etag = user_client.get(url)["ETag"]
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304
+
+
+def test_profile_is_looked_up_once(
+        client: Client, post_with_published_location
+):
+    username = post_with_published_location.author.username
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(f"/profile/{username}/")
+    lookups = [
+        q for q in ctx.captured_queries
+        if 'FROM "auth_user"' in q["sql"] and '"username" =' in q["sql"]
+    ]
+    assert len(lookups) == 1, (
+        "Убедитесь, что профиль загружается одним запросом на страницу."
+    )
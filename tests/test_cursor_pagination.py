@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("cursor_pagination"),
+]
+
+
+@pytest.fixture
+def cursor_pagination():
+    with override_settings(BLOG_CURSOR_PAGINATION=True):
+        yield
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    # Pairs of posts share a pub_date so that the id tie-breaker is used.
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def _walk_feed(client, url):
+    seen, after = [], None
+    while True:
+        response = client.get(url, {"after": after} if after else {})
+        assert response.status_code == 200, (
+            f"Убедитесь, что страница `{url}` с курсором загружается."
+        )
+        page_obj = response.context["page_obj"]
+        seen.extend(post.id for post in page_obj)
+        if not page_obj.has_next():
+            return seen
+        after = page_obj.next_cursor
+
+
+@pytest.mark.parametrize("url_template", [
+    "/",
+    "/category/{category.slug}/",
+    "/profile/{user.username}/",
+])
+def test_cursor_walk_returns_every_post_once(
+        client, feed_posts, user, published_category, url_template
+):
+    url = url_template.format(category=published_category, user=user)
+    expected = [
+        post.id for post in
+        sorted(feed_posts, key=lambda p: (p.pub_date, p.id), reverse=True)
+    ]
+    assert _walk_feed(client, url) == expected, (
+        "Убедитесь, что при постраничном обходе ленты по курсору каждая"
+        " публикация выводится ровно один раз и в правильном порядке."
+    )
+
+
+def test_cursor_page_does_not_count(client, feed_posts):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/")
+    assert not any(
+        "COUNT(*)" in query["sql"] and "blog_post" in query["sql"]
+        for query in ctx.captured_queries
+    ), "Курсорная пагинация не должна выполнять `COUNT(*)` по публикациям."
+
+
+def test_cursor_bad_token(client, feed_posts):
+    response = client.get("/", {"after": "not-a-cursor"})
+    assert response.status_code == 404
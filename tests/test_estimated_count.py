@@ -0,0 +1,50 @@
+import pytest
+from django.test.client import Client
+
+from blog.models import Post
+from blog.pagination import EstimatedCountPaginator
+from blog.views import PostListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_small_result_sets_are_counted_exactly(blend_visible_posts):
+    blend_visible_posts(3)
+    paginator = EstimatedCountPaginator(Post.objects.visible(), 10)
+    assert paginator.count == 3
+    assert not paginator.is_estimate
+    blend_visible_posts()
+    assert EstimatedCountPaginator(Post.objects.visible(), 10).count == 4, (
+        "Убедитесь, что небольшие выборки не берут количество из кеша."
+    )
+
+
+def test_large_result_set_count_is_cached(settings, blend_visible_posts):
+    settings.BLOG_ESTIMATED_COUNT_THRESHOLD = 2
+    blend_visible_posts(3)
+    # Not visible(): its now() would change the key at a minute boundary.
+    posts = Post.objects.filter(is_published=True)
+    paginator = EstimatedCountPaginator(posts, 10)
+    assert paginator.count == 3
+    assert paginator.is_estimate
+    blend_visible_posts(2)
+    assert EstimatedCountPaginator(posts, 10).count == 3, (
+        "Убедитесь, что количество строк в больших выборках кешируется."
+    )
+
+
+def test_feed_renders_windowed_page_range(
+        client: Client, monkeypatch, blend_visible_posts
+):
+    monkeypatch.setattr(PostListView, "paginate_by", 2)
+    blend_visible_posts(24)
+    response = client.get("/", {"page": 4})
+    content = response.content.decode()
+    assert response.context["paginator"].num_pages == 12
+    for page in (1, 3, 5, 6, 12):
+        assert f"page={page}\"" in content
+    assert "page=9\"" not in content, (
+        "Убедитесь, что при большом числе страниц выводится только окно "
+        "вокруг текущей страницы."
+    )
+    assert "…" in content
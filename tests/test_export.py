@@ -0,0 +1,73 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _export(*args):
+    out = StringIO()
+    call_command("export_blog", *args, stdout=out, stderr=StringIO())
+    return out.getvalue()
+
+
+def test_export_jsonl_records(mixer: Mixer):
+    posts = mixer.cycle(3).blend("blog.Post")
+    mixer.blend("blog.Comment", post=posts[0], text="Привет")
+    lines = _export().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["model"] for r in records if r["model"] == "blog.post"] == [
+        "blog.post"
+    ] * 3
+    post = next(r for r in records if r["model"] == "blog.post")
+    assert post["pk"] == posts[0].pk
+    assert post["fields"]["author"] == posts[0].author_id, (
+        "Убедитесь, что внешние ключи выгружаются как id."
+    )
+    comment = next(r for r in records if r["model"] == "blog.comment")
+    assert comment["fields"]["text"] == "Привет"
+    users = [r for r in records if r["model"] == "auth.user"]
+    assert users and all("password" not in r["fields"] for r in users), (
+        "Убедитесь, что пароли пользователей не выгружаются."
+    )
+
+
+def test_export_is_chunked_and_filtered(mixer: Mixer):
+    now = timezone.now()
+    mixer.cycle(2).blend("blog.Post", pub_date=now - timedelta(days=30))
+    new = mixer.cycle(5).blend("blog.Post", pub_date=now)
+    with CaptureQueriesContext(connection) as ctx:
+        out = _export(
+            "--models", "posts", "--chunk-size", "2",
+            "--since", (now - timedelta(days=1)).date().isoformat(),
+        )
+    assert [json.loads(line)["pk"] for line in out.splitlines()] == [
+        post.pk for post in new
+    ], "Убедитесь, что выгрузка фильтруется по дате публикации."
+    assert len(ctx.captured_queries) == 1, (
+        "Убедитесь, что выгрузка идёт одним курсором, а не запросом на чанк."
+    )
+
+
+def test_export_csv(mixer: Mixer, tmp_path):
+    categories = mixer.cycle(2).blend("blog.Category")
+    call_command(
+        "export_blog", "--format", "csv", "--output", str(tmp_path),
+        "--models", "categories,locations",
+        stdout=StringIO(), stderr=StringIO(),
+    )
+    with open(tmp_path / "categories.csv", encoding="utf-8") as stream:
+        rows = list(csv.DictReader(stream))
+    assert [row["slug"] for row in rows] == [c.slug for c in categories]
+    assert (tmp_path / "locations.csv").exists()
+    with pytest.raises(CommandError):
+        _export("--format", "csv")
@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _feed_urls(post):
+    category, author = post.category.slug, post.author.username
+    for kind in ("rss", "atom"):
+        yield f"/feeds/{kind}/"
+        yield f"/feeds/category/{category}/{kind}/"
+        yield f"/feeds/profile/{author}/{kind}/"
+
+
+def test_feeds_list_visible_posts(mixer: Mixer, client: Client, visible_post):
+    hidden = mixer.blend(
+        "blog.Post", author=visible_post.author,
+        category=visible_post.category, is_published=False,
+        title="Скрытая запись",
+    )
+    for url in _feed_urls(visible_post):
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что лента `{url}` доступна."
+        )
+        content = response.content.decode()
+        assert visible_post.title in content
+        assert hidden.title not in content, (
+            f"Убедитесь, что лента `{url}` не содержит скрытых записей."
+        )
+    assert "application/atom+xml" in client.get("/feeds/atom/")[
+        "Content-Type"
+    ]
+
+
+def test_feed_conditional_get(client: Client, visible_post):
+    response = client.get("/feeds/rss/")
+    etag, last_modified = response["ETag"], response["Last-Modified"]
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что лента отвечает 304 при совпадении ETag."
+    )
+    assert not ctx.captured_queries, (
+        "Убедитесь, что неизменная лента отдаётся из кеша без запросов."
+    )
+    response = client.get(
+        "/feeds/rss/", HTTP_IF_MODIFIED_SINCE=last_modified
+    )
+    assert response.status_code == 304
+
+
+def test_feed_changes_after_edit(client: Client, visible_post):
+    etag = client.get("/feeds/rss/")["ETag"]
+    visible_post.title = "Новый заголовок"
+    visible_post.save()
+    response = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что изменение записи сбрасывает кеш ленты."
+    )
+    assert "Новый заголовок" in response.content.decode()
+
+
+def test_feed_cache_is_per_host(client: Client, visible_post):
+    client.get("/feeds/rss/")
+    content = client.get("/feeds/rss/", HTTP_HOST="localhost").content
+    assert b"http://localhost/" in content, (
+        "Убедитесь, что лента, запрошенная с другого хоста, содержит ссылки"
+        " на этот хост."
+    )
+
+
+def test_hidden_category_feed_is_404(mixer: Mixer, client: Client):
+    category = mixer.blend("blog.Category", is_published=False)
+    assert client.get(
+        f"/feeds/category/{category.slug}/rss/"
+    ).status_code == 404
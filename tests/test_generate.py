@@ -0,0 +1,84 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import images, search
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _generate(*args):
+    call_command(
+        "generate_blog_data", "--users", "10", "--categories", "3",
+        "--locations", "5", "--posts", "60", "--comments", "300",
+        "--image-files", "1", *args, stdout=StringIO(),
+    )
+
+
+@pytest.fixture
+def generated():
+    _generate()
+    yield
+    storage = Post._meta.get_field("image").storage
+    for name, renditions in Post.objects.exclude(image="").values_list(
+        "image", "image_renditions"
+    ).distinct():
+        images.delete_renditions(renditions, storage)
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def test_generate_sizes_and_variety(generated):
+    assert get_user_model().objects.count() == 10
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 5
+    assert Post.objects.count() == 60
+    assert Comment.objects.count() == 300
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        "Убедитесь, что генерируются отложенные публикации."
+    )
+    assert Post.objects.filter(is_published=False).exists(), (
+        "Убедитесь, что генерируются скрытые публикации."
+    )
+    post = Post.objects.order_by("pk").last()
+    assert Post.objects.filter(
+        search.matching(post.title), pk=post.pk
+    ).exists(), "Убедитесь, что сгенерированные публикации попадают в поиск."
+    with_image = Post.objects.exclude(image="")
+    assert with_image.exists()
+    assert not with_image.exclude(image_status="ready").exists(), (
+        "Убедитесь, что у сгенерированных фото есть уменьшенные копии."
+    )
+
+
+def test_generate_skews_comments(generated):
+    counts = sorted(
+        Post.objects.values_list("comment_count", flat=True), reverse=True
+    )
+    assert sum(counts) == 300, (
+        "Убедитесь, что после генерации счётчики комментариев верны."
+    )
+    assert sum(counts[:12]) > 300 / 2, (
+        "Убедитесь, что большая часть комментариев приходится на немногие "
+        "публикации."
+    )
+
+
+def test_generate_is_reproducible():
+    def snapshot():
+        return list(Post.objects.order_by("pk").values_list(
+            "title", "author__username", "category_id", "is_published"
+        ))
+
+    _generate("--seed", "7", "--images", "0")
+    first = snapshot()
+    for model in (Comment, Post, Category, Location, get_user_model()):
+        model.objects.all().delete()
+    _generate("--seed", "7", "--images", "0")
+    assert snapshot() == first, (
+        "Убедитесь, что с тем же зерном генерируются те же данные."
+    )
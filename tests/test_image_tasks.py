@@ -0,0 +1,110 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog import images
+from blog.models import ImageTask, Post
+from blog.tasks import claim_next_task, run_task
+from form.post.form_tester import PostFormTester
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _rotated_jpeg() -> ImageFile:
+    img = Image.new("RGB", (800, 400), color=(73, 109, 137))
+    exif = img.getexif()
+    exif[0x0112] = 6  # Orientation: rotate 90 CW to display.
+    img_io = BytesIO()
+    img.save(img_io, format="JPEG", exif=exif)
+    return ImageFile(img_io, name="rotated.jpg")
+
+
+@pytest.fixture
+def queued_post(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=_rotated_jpeg(),
+    )
+    yield post
+    post.refresh_from_db()
+    images.delete_renditions(post.image_renditions, post.image.storage)
+
+
+def test_upload_is_queued_not_processed(queued_post):
+    post = Post.objects.get(pk=queued_post.pk)
+    assert post.image_status == "pending"
+    assert post.image_renditions == {}
+    assert ImageTask.objects.filter(
+        post=post, status=ImageTask.PENDING
+    ).count() == 1
+    post.title = "Другой заголовок"
+    post.save()
+    assert ImageTask.objects.filter(post=post).count() == 1, (
+        "Убедитесь, что для одной публикации в очереди не больше одной"
+        " ожидающей задачи."
+    )
+
+
+def test_worker_fixes_orientation_and_strips_exif(queued_post):
+    call_command("process_image_tasks", "--once", stdout=StringIO())
+    post = Post.objects.get(pk=queued_post.pk)
+    assert post.image_status == "ready"
+    assert ImageTask.objects.get(post=post).status == ImageTask.DONE
+    with post.image.open("rb") as fh:
+        original = Image.open(fh)
+        assert original.size == (400, 800)
+        assert not original.getexif()
+    assert post.image_renditions["widths"] == [320]
+
+
+def test_failed_task_is_retried_then_given_up(queued_post):
+    queued_post.image.storage.delete(queued_post.image.name)
+    with override_settings(BLOG_IMAGE_TASK_MAX_ATTEMPTS=2):
+        task = claim_next_task()
+        assert not run_task(task)
+        task.refresh_from_db()
+        assert task.status == ImageTask.PENDING
+        assert task.run_after > timezone.now()
+        assert claim_next_task() is None, (
+            "Повторная попытка должна выполняться после паузы."
+        )
+        ImageTask.objects.update(run_after=timezone.now())
+        assert not run_task(claim_next_task())
+    task.refresh_from_db()
+    assert task.status == ImageTask.FAILED
+    assert Post.objects.get(pk=queued_post.pk).image_status == "failed"
+
+
+def test_stale_running_task_is_reclaimed(queued_post):
+    task = claim_next_task()
+    assert claim_next_task() is None
+    ImageTask.objects.filter(pk=task.pk).update(
+        locked_at=timezone.now() - timedelta(days=1)
+    )
+    assert claim_next_task().pk == task.pk
+
+
+def test_full_queue_rejects_new_images(user_client, published_category):
+    form_data = {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+        "category": published_category.id,
+        **PostFormTester.generate_files_dict(),
+    }
+    with override_settings(BLOG_IMAGE_QUEUE_LIMIT=0):
+        response = user_client.post("/posts/create/", data=form_data)
+    assert response.status_code == 200
+    assert not Post.objects.exists(), (
+        "Убедитесь, что при переполненной очереди изображений новая"
+        " публикация с изображением не создаётся."
+    )
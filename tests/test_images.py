@@ -0,0 +1,83 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.test.client import Client
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog import images
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post_with_large_image(mixer: Mixer, user, published_category):
+    img_io = BytesIO()
+    Image.new("RGB", (1500, 1000), color=(73, 109, 137)).save(
+        img_io, format="JPEG"
+    )
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=ImageFile(img_io, name="large_image.jpg"),
+    )
+    call_command("process_image_tasks", "--once", stdout=StringIO())
+    post.refresh_from_db()
+    yield post
+    images.delete_renditions(post.image_renditions, post.image.storage)
+
+
+def test_renditions_created_on_upload(post_with_large_image):
+    post = post_with_large_image
+    renditions = post.image_renditions
+    assert (renditions["width"], renditions["height"]) == (1500, 1000)
+    assert renditions["widths"] == [320, 640, 1280]
+    storage = post.image.storage
+    for name in images.rendition_names(renditions):
+        assert storage.exists(name), (
+            "Убедитесь, что при загрузке изображения создаётся копия"
+            f" `{name}`."
+        )
+    name = renditions["files"]["webp"][1]
+    with storage.open(name) as fh:
+        assert Image.open(fh).size == (640, 427)
+
+
+def test_small_images_are_not_upscaled(post_with_published_location):
+    post = post_with_published_location
+    call_command("process_image_tasks", "--once", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.image_renditions["widths"] == []
+    assert post.image_srcset == ""
+
+
+def test_srcset_in_templates(
+        user_client: Client, post_with_large_image
+):
+    post = post_with_large_image
+    for url in ("/", f"/posts/{post.id}/"):
+        content = user_client.get(url).content.decode("utf-8")
+        assert post.image_webp_srcset in content, (
+            f"Убедитесь, что на странице `{url}` изображение публикации"
+            " выводится с атрибутом `srcset`."
+        )
+        assert content.count('loading="lazy"') == 1
+
+
+def test_make_image_renditions_command(post_with_large_image):
+    post = post_with_large_image
+    images.delete_renditions(post.image_renditions, post.image.storage)
+    Post.objects.filter(pk=post.pk).update(image_renditions={})
+    call_command("make_image_renditions", stdout=StringIO())
+    post.refresh_from_db()
+    assert images.is_current(post.image, post.image_renditions)
+    storage = post.image.storage
+    assert all(
+        storage.exists(name)
+        for name in images.rendition_names(post.image_renditions)
+    )
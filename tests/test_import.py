@@ -0,0 +1,188 @@
+import json
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from mixer.backend.django import Mixer
+
+from blog import search
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _import(*args):
+    out = StringIO()
+    call_command("import_blog", *args, stdout=out, stderr=StringIO())
+    return out.getvalue()
+
+
+def test_import_db_json():
+    out = _import(str(settings.BASE_DIR.parent / "db.json"))
+    assert get_user_model().objects.count() == 4
+    assert Category.objects.count() == 6
+    assert Location.objects.count() == 12
+    assert Post.objects.count() == 39, (
+        "Убедитесь, что команда загружает публикации из db.json."
+    )
+    post = Post.objects.get(pk=1)
+    assert (post.author_id, post.category_id, post.location_id) == (3, 4, 5)
+    assert Post.objects.filter(search.matching("обед")).exists(), (
+        "Убедитесь, что загруженные публикации попадают в поиск."
+    )
+    assert "admin.logentry" in out and "строк/с" in out
+
+
+def test_import_export_round_trip(mixer: Mixer, tmp_path):
+    posts = mixer.cycle(3).blend("blog.Post")
+    mixer.cycle(2).blend("blog.Comment", post=posts[0])
+    created = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    Post.objects.filter(pk=posts[0].pk).update(created_at=created)
+    call_command(
+        "export_blog", "--output", str(tmp_path),
+        stdout=StringIO(), stderr=StringIO(),
+    )
+    expected = list(Post.objects.order_by("pk").values_list(
+        "pk", "title", "author__username", "category__slug"
+    ))
+    Comment.objects.all().delete()
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    names = ["users", "categories", "locations", "posts", "comments"]
+    _import(*(str(tmp_path / f"{name}.jsonl") for name in names))
+    assert list(Post.objects.order_by("pk").values_list(
+        "pk", "title", "author__username", "category__slug"
+    )) == expected, "Убедитесь, что связи восстанавливаются после загрузки."
+    assert Post.objects.get(pk=posts[0].pk).created_at == created, (
+        "Убедитесь, что после загрузки сохраняются даты создания."
+    )
+    assert Post.objects.get(pk=posts[0].pk).comment_count == 2, (
+        "Убедитесь, что после загрузки пересчитываются счётчики комментариев."
+    )
+
+
+def test_import_maps_reference_rows(mixer: Mixer, tmp_path):
+    user = mixer.blend(get_user_model(), username="author")
+    category = mixer.blend("blog.Category", slug="travel")
+    records = [
+        {"model": "auth.user", "pk": 100, "fields": {"username": "author"}},
+        {"model": "blog.category", "pk": 200, "fields": {
+            "title": "Путешествия", "description": "", "slug": "travel",
+        }},
+        {"model": "blog.post", "pk": 300, "fields": {
+            "title": "Заголовок", "text": "Текст", "author": 100,
+            "category": 200, "location": 999,
+            "pub_date": "2022-12-18T23:06:18Z",
+        }},
+        {"model": "blog.comment", "pk": 400, "fields": {
+            "text": "Без публикации", "author": 100, "post": 12345,
+        }},
+    ]
+    path = tmp_path / "data.jsonl"
+    path.write_text(
+        "\n".join(json.dumps(record) for record in records), encoding="utf-8"
+    )
+    _import(str(path), "--batch-size", "1")
+    post = Post.objects.get(pk=300)
+    assert (post.author_id, post.category_id) == (user.pk, category.pk), (
+        "Убедитесь, что авторы и категории сопоставляются с существующими."
+    )
+    assert post.location_id is None
+    assert not Comment.objects.exists(), (
+        "Убедитесь, что комментарии к несуществующим публикациям пропускаются."
+    )
+
+
+def test_import_does_not_merge_locations_by_title(mixer: Mixer, tmp_path):
+    hidden = mixer.blend("blog.Location", title="Москва", is_published=False)
+    records = [
+        {"model": "auth.user", "pk": 100, "fields": {"username": "author"}},
+        *(
+            {"model": "blog.location", "pk": pk, "fields": {
+                "title": "Москва", "is_published": True,
+            }}
+            for pk in (7, 8)
+        ),
+        {"model": "blog.post", "pk": 300, "fields": {
+            "title": "Заголовок", "text": "", "author": 100, "location": 8,
+            "pub_date": "2022-12-18T23:06:18Z",
+        }},
+    ]
+    path = tmp_path / "data.jsonl"
+    path.write_text(
+        "\n".join(json.dumps(record) for record in records), encoding="utf-8"
+    )
+    _import(str(path))
+    assert Location.objects.filter(title="Москва").count() == 3, (
+        "Убедитесь, что местоположения с одинаковым названием не"
+        " объединяются при загрузке."
+    )
+    location = Post.objects.get(pk=300).location
+    assert location != hidden and location.is_published
+
+
+def test_import_indexes_only_imported_posts(mixer: Mixer, tmp_path):
+    existing = mixer.blend("blog.Post", title="Туман")
+    search.remove_post(existing.pk)
+    path = tmp_path / "data.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in [
+        {"model": "auth.user", "pk": 100, "fields": {"username": "author"}},
+        {"model": "blog.post", "pk": 300, "fields": {
+            "title": "Рассвет", "text": "", "author": 100,
+            "pub_date": "2022-12-18T23:06:18Z",
+        }},
+    ]), encoding="utf-8")
+    _import(str(path))
+    assert Post.objects.filter(search.matching("рассвет")).exists()
+    assert not Post.objects.filter(search.matching("туман")).exists(), (
+        "Убедитесь, что загрузка индексирует только загруженные публикации."
+    )
+
+
+def test_failed_import_catches_up_on_committed_rows(mixer: Mixer, tmp_path):
+    existing = mixer.blend("blog.Post")
+    records = [
+        {"model": "auth.user", "pk": 100, "fields": {"username": "author"}},
+        {"model": "blog.post", "pk": 300, "fields": {
+            "title": "Гроза", "text": "", "author": 100,
+            "pub_date": "2022-12-18T23:06:18Z",
+        }},
+        {"model": "blog.comment", "pk": 400, "fields": {
+            "text": "Первый", "author": 100, "post": 300,
+        }},
+        {"model": "blog.post", "pk": existing.pk, "fields": {
+            "title": "Повтор", "text": "", "author": 100,
+            "pub_date": "2022-12-18T23:06:18Z",
+        }},
+    ]
+    path = tmp_path / "data.jsonl"
+    path.write_text(
+        "\n".join(json.dumps(record) for record in records), encoding="utf-8"
+    )
+    with pytest.raises(CommandError):
+        _import(str(path), "--batch-size", "1")
+    assert Post.objects.get(pk=300).comment_count == 1, (
+        "Убедитесь, что после ошибки загрузки счётчики комментариев"
+        " пересчитываются для уже загруженных записей."
+    )
+    assert Post.objects.filter(search.matching("гроза")).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_defers_indexes():
+    out = _import(
+        str(settings.BASE_DIR.parent / "db.json"), "--defer-indexes"
+    )
+    assert Post.objects.count() == 39
+    with connection.cursor() as cursor:
+        indexes = connection.introspection.get_constraints(
+            cursor, Post._meta.db_table
+        )
+    assert "post_feed_idx" in indexes, (
+        "Убедитесь, что отложенные индексы создаются заново."
+    )
+    assert "строк/с" in out
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+
+from blog.models import Comment, Post
+from blog.pagination import CommentCursorPaginator, CursorPaginator
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite"
+    ),
+]
+
+
+def _query_plan(queryset) -> str:
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return "\n".join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.parametrize(("name", "get_queryset", "index"), [
+    ("feed", lambda c, u: Post.objects.visible()[:10], "post_feed_idx"),
+    (
+        "cursor",
+        lambda c, u: CursorPaginator(Post.objects.visible(), 10)
+        .object_list[:11],
+        "post_feed_idx",
+    ),
+    (
+        "category",
+        lambda c, u: Post.objects.visible().filter(category=c)[:10],
+        "post_category_feed_idx",
+    ),
+    (
+        "profile",
+        lambda c, u: Post.objects.visible().filter(author=u)[:10],
+        "post_author_feed_idx",
+    ),
+    (
+        "own profile",
+        lambda c, u: Post.objects.for_feed().filter(author=u)[:10],
+        "post_author_feed_idx",
+    ),
+    (
+        "admin",
+        lambda c, u: Post.objects.order_by("-pub_date", "-pk")[:100],
+        "post_date_idx",
+    ),
+    (
+        "comments",
+        lambda c, u: Comment.objects.filter(post_id=1).order_by("created_at"),
+        "comment_post_created_idx",
+    ),
+    (
+        "comment cursor",
+        lambda c, u: CommentCursorPaginator(
+            Comment.objects.filter(post_id=1), 20
+        ).object_list[:21],
+        "comment_post_created_idx",
+    ),
+])
+def test_feed_queries_use_indexes(
+        published_category, user, name, get_queryset, index
+):
+    plan = _query_plan(get_queryset(published_category, user))
+    assert f"USING INDEX {index}" in plan, (
+        f"Запрос `{name}` должен использовать индекс `{index}`:\n{plan}"
+    )
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, (
+        f"Запрос `{name}` не должен сортировать строки отдельно:\n{plan}"
+    )
@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.lookups import categories
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _table_reads(ctx, table):
+    return [
+        query["sql"] for query in ctx.captured_queries
+        if f'FROM "{table}"' in query["sql"]
+    ]
+
+
+def test_category_page_does_not_query_categories(
+        visible_post, user_client: Client
+):
+    url = f"/category/{visible_post.category.slug}/"
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert response.context["category"] == visible_post.category
+    assert not _table_reads(ctx, "blog_category"), (
+        "Убедитесь, что категория страницы берётся из кеша справочников."
+    )
+
+
+def test_feed_posts_resolve_category_and_location_from_lookups(
+        visible_post, django_assert_num_queries
+):
+    posts = list(Post.objects.visible())
+    with django_assert_num_queries(0):
+        assert posts[0].category.title == visible_post.category.title
+        assert posts[0].location.title == visible_post.location.title
+
+
+def test_lookups_follow_changes(visible_post, client: Client):
+    category = visible_post.category
+    assert categories.get_by_slug(category.slug) == category
+    category.title = "Новое название"
+    category.save()
+    assert categories.get(category.pk).title == "Новое название", (
+        "Убедитесь, что кеш справочников сбрасывается при изменении записи."
+    )
+    category.is_published = False
+    category.save()
+    assert client.get(f"/category/{category.slug}/").status_code == 404
+    category.delete()
+    assert categories.get_by_slug(category.slug) is None
+
+
+def test_lookups_expire_without_signals(visible_post, settings):
+    category = visible_post.category
+    assert categories.get(category.pk).title == category.title
+    Category.objects.filter(pk=category.pk).update(title="Без сигналов")
+    assert categories.get(category.pk).title == category.title
+    settings.BLOG_LOOKUP_TTL = 0
+    assert categories.get(category.pk).title == "Без сигналов", (
+        "Убедитесь, что кеш справочников устаревает через BLOG_LOOKUP_TTL."
+    )
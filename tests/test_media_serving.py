@@ -0,0 +1,95 @@
+import pytest
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+HASHED = "posts_image/ab/" + "ab" * 32 + ".jpg"
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    for name in (HASHED, "plain.txt"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(DATA)
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_media_file_is_served_whole(client: Client):
+    response = client.get(f"/media/{HASHED}")
+    assert response.status_code == 200, (
+        "Убедитесь, что файлы из MEDIA_ROOT отдаются по адресу /media/."
+    )
+    assert _body(response) == DATA
+    assert response["Content-Type"] == "image/jpeg"
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем содержимого в имени кешируются "
+        "как неизменяемые."
+    )
+
+
+def test_plain_media_name_is_not_immutable(client: Client, settings):
+    response = client.get("/media/plain.txt")
+    assert response.status_code == 200
+    assert response["Cache-Control"] == (
+        f"public, max-age={settings.MEDIA_MAX_AGE}"
+    ), (
+        "Убедитесь, что файлы без хеша в имени кешируются на "
+        "MEDIA_MAX_AGE секунд."
+    )
+
+
+def test_media_range_request(client: Client):
+    response = client.get(f"/media/{HASHED}", HTTP_RANGE="bytes=10-19")
+    assert response.status_code == 206, (
+        "Убедитесь, что запрос с заголовком Range получает ответ 206."
+    )
+    assert _body(response) == DATA[10:20]
+    assert response["Content-Range"] == f"bytes 10-19/{len(DATA)}"
+    assert response["Content-Length"] == "10"
+
+    response = client.get(f"/media/{HASHED}", HTTP_RANGE="bytes=-5")
+    assert response.status_code == 206
+    assert _body(response) == DATA[-5:]
+
+    response = client.get(
+        f"/media/{HASHED}", HTTP_RANGE=f"bytes={len(DATA)}-"
+    )
+    assert response.status_code == 416, (
+        "Убедитесь, что диапазон за пределами файла отклоняется с кодом 416."
+    )
+
+
+def test_media_if_range_mismatch_sends_whole_file(client: Client):
+    response = client.get(
+        f"/media/{HASHED}", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == 200
+    assert _body(response) == DATA
+
+
+def test_media_if_none_match(client: Client):
+    etag = client.get(f"/media/{HASHED}")["ETag"]
+    response = client.get(f"/media/{HASHED}", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        "Убедитесь, что при совпадении ETag возвращается ответ 304."
+    )
+
+
+def test_media_accel_redirect(client: Client, settings):
+    settings.MEDIA_ACCEL_REDIRECT = "/protected-media/"
+    response = client.get(f"/media/{HASHED}")
+    assert response.status_code == 200
+    assert response["X-Accel-Redirect"] == f"/protected-media/{HASHED}"
+    assert response.content == b""
+
+
+@pytest.mark.parametrize("path", ["../settings.py", "posts_image", "nope"])
+def test_media_outside_root_or_missing(client: Client, path):
+    assert client.get(f"/media/{path}").status_code == 404
@@ -0,0 +1,225 @@
+import hashlib
+import os
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    # Files here are fresh; only the claim tests rely on the grace period.
+    settings.BLOG_ORPHAN_IMAGE_MIN_AGE = 0
+
+
+def _image_bytes(color=(73, 109, 137)) -> bytes:
+    img_io = BytesIO()
+    Image.new("RGB", (500, 300), color=color).save(img_io, format="JPEG")
+    return img_io.getvalue()
+
+
+def _blend(mixer: Mixer, data: bytes, name="photo.jpg"):
+    return mixer.blend(
+        "blog.Post", image=ImageFile(BytesIO(data), name=name)
+    )
+
+
+def test_identical_uploads_share_one_file(mixer: Mixer):
+    data = _image_bytes()
+    first = _blend(mixer, data, "first.jpg")
+    second = _blend(mixer, data, "second.jpg")
+    digest = hashlib.sha256(data).hexdigest()
+    assert first.image.name == second.image.name == (
+        f"posts_image/{digest[:2]}/{digest}.jpg"
+    ), (
+        "Убедитесь, что изображения хранятся под именем, полученным из их"
+        " содержимого, и одинаковые файлы не дублируются."
+    )
+
+
+def test_shared_file_removed_with_last_post(
+        mixer: Mixer, django_capture_on_commit_callbacks
+):
+    data = _image_bytes()
+    first, second = _blend(mixer, data), _blend(mixer, data)
+    call_command("process_image_tasks", "--once", stdout=StringIO())
+    first.refresh_from_db()
+    storage = first.image.storage
+    name = first.image.name
+    rendition = first.image_renditions["files"]["webp"][0]
+    assert storage.exists(rendition)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert storage.exists(name), (
+        "Файл, на который ссылается другая публикация, удалять нельзя."
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.get(pk=second.pk).delete()
+    assert not storage.exists(name), (
+        "Убедитесь, что после удаления публикации её изображение удаляется."
+    )
+    assert not storage.exists(rendition)
+
+
+def test_replaced_image_is_released(
+        mixer: Mixer, django_capture_on_commit_callbacks
+):
+    post = _blend(mixer, _image_bytes())
+    old_name = post.image.name
+    storage = post.image.storage
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = ImageFile(
+            BytesIO(_image_bytes((1, 2, 3))), name="new.jpg"
+        )
+        post.save()
+    assert post.image.name != old_name
+    assert storage.exists(post.image.name)
+    assert not storage.exists(old_name), (
+        "Убедитесь, что при замене изображения старый файл удаляется."
+    )
+
+
+def test_collect_orphan_images(mixer: Mixer):
+    post = _blend(mixer, _image_bytes())
+    storage = post.image.storage
+    orphan = storage.save(
+        "posts_image/orphan.jpg", ContentFile(_image_bytes((9, 9, 9)))
+    )
+    call_command(
+        "collect_orphan_images", "--min-age", "0", stdout=StringIO()
+    )
+    assert not storage.exists(orphan)
+    assert storage.exists(post.image.name)
+
+
+def _age(storage, name, seconds=2 * 60 * 60):
+    past = time.time() - seconds
+    os.utime(storage.path(name), (past, past))
+
+
+def test_reused_file_survives_release(
+        mixer: Mixer, settings, django_capture_on_commit_callbacks
+):
+    settings.BLOG_ORPHAN_IMAGE_MIN_AGE = 60 * 60
+    data = _image_bytes()
+    post = _blend(mixer, data)
+    storage = post.image.storage
+    name = post.image.name
+    _age(storage, name)
+    # An identical upload whose post has not been saved yet.
+    assert storage.save("posts_image/again.jpg", ContentFile(data)) == name
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert storage.exists(name), (
+        "Убедитесь, что файл, только что повторно использованный другой"
+        " загрузкой, не удаляется вместе со старой публикацией."
+    )
+    call_command("collect_orphan_images", stdout=StringIO())
+    assert storage.exists(name)
+
+
+def test_old_unreferenced_file_is_released(
+        mixer: Mixer, settings, django_capture_on_commit_callbacks
+):
+    settings.BLOG_ORPHAN_IMAGE_MIN_AGE = 60 * 60
+    post = _blend(mixer, _image_bytes())
+    storage = post.image.storage
+    name = post.image.name
+    _age(storage, name)
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert not storage.exists(name)
+
+
+def test_save_after_release_writes_file_again(mixer: Mixer):
+    data = _image_bytes()
+    post = _blend(mixer, data)
+    storage = post.image.storage
+    name = post.image.name
+    assert storage.release(name, 0)
+    assert not storage.claim(name)
+    assert storage.save("posts_image/again.jpg", ContentFile(data)) == name
+    assert storage.exists(name), (
+        "Убедитесь, что загрузка удалённого файла записывает его заново."
+    )
+
+
+def _rotated_image_bytes() -> bytes:
+    img_io = BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new("RGB", (1000, 600), color=(73, 109, 137)).save(
+        img_io, format="JPEG", exif=exif
+    )
+    return img_io.getvalue()
+
+
+def _assert_normalized(post, name):
+    storage = post.image.storage
+    assert post.image.name != name, (
+        "Убедитесь, что исправленный оригинал сохраняется под новым именем,"
+        " полученным из его содержимого."
+    )
+    assert post.image_renditions["name"] == post.image.name
+    with storage.open(post.image.name) as fh:
+        image = Image.open(fh)
+        assert image.size == (600, 1000)
+        assert not image.getexif(), (
+            "Убедитесь, что из оригинала удаляются данные EXIF."
+        )
+        fh.seek(0)
+        digest = hashlib.sha256(fh.read()).hexdigest()
+    assert post.image.name.endswith(f"{digest}.jpg")
+    with storage.open(post.image_renditions["files"]["jpeg"][0]) as fh:
+        assert Image.open(fh).size == (320, 533)
+
+
+def test_normalized_original_gets_new_name(
+        mixer: Mixer, settings, django_capture_on_commit_callbacks
+):
+    settings.BLOG_ORPHAN_IMAGE_MIN_AGE = 60 * 60
+    data = _rotated_image_bytes()
+    post = _blend(mixer, data)
+    storage = post.image.storage
+    name = post.image.name
+    with django_capture_on_commit_callbacks() as callbacks:
+        call_command("process_image_tasks", "--once", stdout=StringIO())
+    post.refresh_from_db()
+    _assert_normalized(post, name)
+    with storage.open(name) as fh:
+        assert fh.read() == data, (
+            "Файл с именем из хеша содержимого нельзя перезаписывать."
+        )
+    for callback in callbacks:
+        callback()
+    assert not storage.exists(name), (
+        "Убедитесь, что оригинал с данными EXIF удаляется после обработки."
+    )
+
+
+def test_queue_overflow_is_normalized_later(
+        mixer: Mixer, settings, django_capture_on_commit_callbacks
+):
+    settings.BLOG_IMAGE_QUEUE_LIMIT = 0
+    post = _blend(mixer, _rotated_image_bytes())
+    storage = post.image.storage
+    name = post.image.name
+    post.refresh_from_db()
+    assert post.image_status == "failed"
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("make_image_renditions", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.image_status == "ready"
+    _assert_normalized(post, name)
+    assert not storage.exists(name)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.schedule import next_publication, publication_aware_timeout
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_index_is_cached(
+        client: Client, post_with_published_location
+):
+    first = client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get("/")
+    assert second.content == first.content
+    assert not ctx.captured_queries, (
+        "Убедитесь, что повторный анонимный запрос ленты обслуживается из"
+        " кэша без обращений к БД."
+    )
+
+
+def test_logged_in_index_is_not_cached(
+        user_client: Client, post_with_published_location
+):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get("/")
+    assert ctx.captured_queries
+
+
+def test_page_cache_invalidated_on_write(
+        client: Client, mixer: Mixer, post_with_published_location
+):
+    category = post_with_published_location.category
+    client.get(f"/category/{category.slug}/")
+    new_post = mixer.blend(
+        "blog.Post",
+        category=category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(minutes=1),
+        title="Свежая публикация",
+    )
+    for url in ("/", f"/category/{category.slug}/"):
+        assert new_post.title in client.get(url).content.decode("utf-8"), (
+            "Убедитесь, что после создания публикации закэшированные"
+            f" страницы ленты `{url}` обновляются."
+        )
+
+
+def test_page_cache_expires_at_next_publication(
+        mixer: Mixer, post_with_published_location
+):
+    mixer.blend(
+        "blog.Post",
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    assert 0 < publication_aware_timeout(600) <= 30, (
+        "Убедитесь, что кэш страниц ленты истекает не позже даты ближайшей"
+        " отложенной публикации."
+    )
+
+
+def test_feed_cache_headers_follow_next_publication(
+        client: Client, mixer: Mixer, post_with_published_location
+):
+    response = client.get("/")
+    assert "max-age=60" in response["Cache-Control"]
+    assert "Expires" in response
+    mixer.blend(
+        "blog.Post",
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=20),
+    )
+    max_age = int(client.get("/")["Cache-Control"].split("max-age=")[1])
+    assert 0 < max_age <= 20, (
+        "Убедитесь, что `Cache-Control: max-age` ленты не превышает время до"
+        " ближайшей отложенной публикации."
+    )
+
+
+def test_next_publication_is_cached_and_refreshed_on_write(
+        mixer: Mixer, post_with_published_location
+):
+    assert next_publication() is None
+    with CaptureQueriesContext(connection) as ctx:
+        assert next_publication() is None
+    assert not ctx.captured_queries
+    future = mixer.blend(
+        "blog.Post",
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+    assert next_publication() == future.pub_date
+
+
+def test_page_cached_before_commit_is_dropped(
+        client: Client, django_capture_on_commit_callbacks,
+        post_with_published_location
+):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = "Новый заголовок публикации"
+        post.save()
+        # A page rendered before the commit may show the old rows.
+        client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/")
+    assert ctx.captured_queries, (
+        "Убедитесь, что страница, закешированная до фиксации транзакции,"
+        " не отдаётся после неё."
+    )
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+from django.test.client import Client
+
+from blog import cache as blog_cache
+from blog.cache import bump_version, card_cache_stats, post_card_key
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _index(client: Client) -> str:
+    return client.get("/").content.decode("utf-8")
+
+
+def test_post_card_is_served_from_cache(
+        user_client: Client, post_with_published_location
+):
+    first = _index(user_client)
+    assert card_cache_stats() == {"hits": 0, "misses": 1}
+    assert _index(user_client) == first
+    assert card_cache_stats() == {"hits": 1, "misses": 1}
+
+
+def test_card_hits_are_not_written_per_request(
+        user_client: Client, post_with_published_location, monkeypatch
+):
+    _index(user_client)
+    writes = []
+    cache = blog_cache.get_cache()
+    for name in ("set", "add", "incr"):
+        monkeypatch.setattr(
+            cache, name, lambda *args, name=name, **kwargs: writes.append(name)
+        )
+    monkeypatch.setattr(blog_cache, "_stats_flushed_at", time.monotonic())
+    _index(user_client)
+    assert not writes, (
+        "Убедитесь, что карточка из кеша отдаётся без записи в кеш."
+    )
+
+
+def test_post_card_invalidated_on_post_change(
+        client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    _index(client)
+    post.title = "Новый заголовок публикации"
+    post.save()
+    assert "Новый заголовок публикации" in _index(client), (
+        "Убедитесь, что после изменения публикации её карточка в ленте"
+        " обновляется."
+    )
+
+
+def test_post_card_invalidated_on_comment(
+        client: Client, user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    assert "Комментарии (0)" in _index(client)
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Текст"})
+    assert "Комментарии (1)" in _index(client), (
+        "Убедитесь, что после добавления комментария счётчик комментариев в"
+        " карточке публикации обновляется."
+    )
+
+
+def test_post_card_invalidated_on_category_change(
+        client: Client, post_with_published_location
+):
+    category = post_with_published_location.category
+    _index(client)
+    category.title = "Переименованная категория"
+    category.save()
+    assert "Переименованная категория" in _index(client), (
+        "Убедитесь, что после изменения категории карточки её публикаций"
+        " обновляются."
+    )
+
+
+def test_post_card_version_bumped_again_on_commit(
+        django_capture_on_commit_callbacks, post_with_published_location
+):
+    post = post_with_published_location
+    before = post_card_key(post)
+    with django_capture_on_commit_callbacks(execute=True):
+        bump_version("post", post.pk)
+        # What a concurrent request would cache before the commit.
+        during = post_card_key(post)
+    assert before != during != post_card_key(post), (
+        "Убедитесь, что версия карточки меняется ещё раз после фиксации"
+        " транзакции."
+    )
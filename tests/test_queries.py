@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client: Client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+def _feed_urls(post):
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+
+
+@pytest.mark.parametrize("client_fixture", ["unlogged_client", "user_client"])
+def test_feed_query_count_does_not_depend_on_page_size(
+        mixer: Mixer, request, client_fixture, blend_visible_posts
+):
+    client = request.getfixturevalue(client_fixture)
+    author = mixer.blend("auth.User")
+    category = mixer.blend("blog.Category", is_published=True)
+    first = blend_visible_posts(1, author=author, category=category)[0]
+    small = {url: _count_queries(client, url) for url in _feed_urls(first)}
+
+    blend_visible_posts(N_PER_PAGE, author=author, category=category)
+    blend_visible_posts(N_PER_PAGE)
+    for url in _feed_urls(first):
+        assert _count_queries(client, url) == small[url], (
+            f"Убедитесь, что количество запросов к БД на странице `{url}`"
+            " не зависит от количества публикаций на странице."
+        )
+
+
+def test_own_profile_query_count_does_not_depend_on_page_size(
+        user, user_client, blend_visible_posts
+):
+    blend_visible_posts(1, author=user)
+    url = f"/profile/{user.username}/"
+    small = _count_queries(user_client, url)
+    blend_visible_posts(N_PER_PAGE, author=user)
+    assert _count_queries(user_client, url) == small, (
+        "Убедитесь, что количество запросов к БД на странице своего профиля"
+        " не зависит от количества публикаций на странице."
+    )
+
+
+def test_post_detail_query_count(
+        mixer: Mixer, unlogged_client, user_client, blend_visible_posts
+):
+    post = blend_visible_posts(1)[0]
+    url = f"/posts/{post.id}/"
+    mixer.blend("blog.Comment", post=post)
+    # The first request also fills the conditional GET validators cache.
+    _count_queries(unlogged_client, url)
+    assert _count_queries(unlogged_client, url) == 2, (
+        "Убедитесь, что страница публикации загружает публикацию вместе со"
+        " связанными объектами одним запросом, а комментарии — вторым."
+    )
+    logged_in = _count_queries(user_client, url)
+    mixer.cycle(N_PER_PAGE).blend("blog.Comment", post=post)
+    assert _count_queries(user_client, url) == logged_in, (
+        "Убедитесь, что количество запросов к БД на странице публикации"
+        " не зависит от количества комментариев."
+    )
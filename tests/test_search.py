@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+from django.test.client import Client
+from django.utils import timezone
+
+from blog import search
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=["fts5", "python"])
+def backend(request, settings):
+    settings.BLOG_SEARCH_BACKEND = request.param
+    return request.param
+
+
+def _found(query):
+    return list(search.search(Post.objects.visible(), query))
+
+
+def test_search_matches_word_forms(blend_visible_posts, backend):
+    post = blend_visible_posts(
+        title="Кошки на крыше", text="Рыжие коты гуляют."
+    )[0]
+    blend_visible_posts(title="Собаки", text="Во дворе.")
+    assert _found("кошка") == [post], (
+        "Убедитесь, что поиск находит публикации по разным формам слова."
+    )
+    assert _found("кошка двор") == [], (
+        "Убедитесь, что поиск требует совпадения всех слов запроса."
+    )
+
+
+def test_search_ranks_title_matches_first(blend_visible_posts, backend):
+    in_text = blend_visible_posts(
+        title="Прогулка", text="Видели лису в лесу."
+    )[0]
+    in_title = blend_visible_posts(title="Лиса", text="Рыжая и хитрая.")[0]
+    assert _found("лиса") == [in_title, in_text], (
+        "Убедитесь, что совпадения в заголовке ранжируются выше."
+    )
+
+
+def test_search_index_follows_edits(blend_visible_posts, backend):
+    post = blend_visible_posts(title="Зима", text="Снег.")[0]
+    post.title = "Лето"
+    post.save()
+    assert _found("зима") == []
+    assert _found("лето") == [post], (
+        "Убедитесь, что индекс обновляется при изменении публикации."
+    )
+    post.delete()
+    assert _found("лето") == []
+
+
+def test_search_respects_visibility(blend_visible_posts, backend):
+    for hidden in (
+        dict(is_published=False),
+        dict(pub_date=timezone.now() + timedelta(1)),
+        dict(category__is_published=False),
+    ):
+        blend_visible_posts(title="Черновик", text="", **hidden)
+    assert _found("черновик") == [], (
+        "Убедитесь, что поиск не показывает скрытые и отложенные публикации."
+    )
+
+
+def test_rebuild_search_index(blend_visible_posts, backend):
+    post = blend_visible_posts(title="Река", text="")[0]
+    Post.objects.filter(pk=post.pk).update(title="Озеро")
+    assert search.rebuild_index() == 1
+    assert _found("озеро") == [post]
+    assert _found("река") == []
+
+
+def test_python_search_reuses_post_count(
+        blend_visible_posts, settings, django_assert_num_queries
+):
+    settings.BLOG_SEARCH_BACKEND = "python"
+    blend_visible_posts(title="Облака", text="")
+    _found("облако")
+    # One query for the term frequencies and one for the posts.
+    with django_assert_num_queries(2):
+        assert len(_found("облако")) == 1, (
+            "Убедитесь, что поиск не пересчитывает все публикации на каждый"
+            " запрос."
+        )
+
+
+def test_search_view_paginates_and_keeps_query(
+        blend_visible_posts, client: Client
+):
+    blend_visible_posts(11, title="Горы", text="")
+    blend_visible_posts(title="Море", text="")
+    response = client.get("/search/", {"q": "горы"})
+    assert response.status_code == 200, (
+        "Убедитесь, что страница поиска доступна по адресу `/search/`."
+    )
+    page_obj = response.context["page_obj"]
+    assert page_obj.paginator.count == 11
+    assert len(page_obj.object_list) == 10
+    next_page = "?q=%D0%B3%D0%BE%D1%80%D1%8B&amp;page=2"
+    assert next_page in response.content.decode(), (
+        "Убедитесь, что ссылки пагинации сохраняют поисковый запрос."
+    )
+    response = client.get("/search/")
+    assert response.status_code == 200
+    assert not response.context["page_obj"].object_list
@@ -0,0 +1,79 @@
+from xml.etree import ElementTree
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+NS = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+def _get_xml(client: Client, url):
+    response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что карта сайта `{url}` доступна."
+    )
+    content = b"".join(response) if response.streaming else response.content
+    return ElementTree.fromstring(content)
+
+
+def _locs(root):
+    return [loc.text for loc in root.iterfind(".//s:loc", NS)]
+
+
+def test_sitemap_index_lists_chunks(
+        client: Client, settings, blend_visible_posts
+):
+    settings.BLOG_SITEMAP_CHUNK_SIZE = 2
+    posts = blend_visible_posts(5)
+    hidden = blend_visible_posts(is_published=False)[0]
+    index = _get_xml(client, "/sitemap.xml")
+    sitemaps = [loc.replace("http://testserver", "") for loc in _locs(index)]
+    assert "/sitemap-categories.xml" in sitemaps
+    post_chunks = [s for s in sitemaps if s.startswith("/sitemap-posts-")]
+    assert len(post_chunks) == len({p.id // 2 for p in posts}), (
+        "Убедитесь, что публикации разбиты на части по диапазонам id."
+    )
+    assert index.find(".//s:lastmod", NS) is not None
+
+    listed = []
+    for chunk in post_chunks:
+        listed += _locs(_get_xml(client, chunk))
+    assert sorted(listed) == sorted(
+        f"http://testserver/posts/{post.id}/" for post in posts
+    )
+    assert f"http://testserver/posts/{hidden.id}/" not in listed, (
+        "Убедитесь, что в карту сайта не попадают скрытые публикации."
+    )
+
+
+def test_sitemap_categories_and_profiles(
+        mixer: Mixer, client: Client, visible_post
+):
+    post = visible_post
+    hidden_category = mixer.blend("blog.Category", is_published=False)
+    categories = _locs(_get_xml(client, "/sitemap-categories.xml"))
+    assert f"http://testserver/category/{post.category.slug}/" in categories
+    assert not any(hidden_category.slug in loc for loc in categories)
+
+    index = _locs(_get_xml(client, "/sitemap.xml"))
+    profile_chunk = next(loc for loc in index if "profiles" in loc)
+    profiles = _locs(_get_xml(client, profile_chunk))
+    assert profiles == [
+        f"http://testserver/profile/{post.author.username}/"
+    ], "Убедитесь, что в карту сайта попадают профили авторов."
+
+
+def test_sitemap_chunk_is_cached(client: Client, visible_post):
+    post = visible_post
+    url = "/sitemap-posts-0.xml"
+    first = _locs(_get_xml(client, url))
+    with CaptureQueriesContext(connection) as ctx:
+        second = _locs(_get_xml(client, url))
+    assert first == second == [f"http://testserver/posts/{post.id}/"]
+    assert not ctx.captured_queries, (
+        "Убедитесь, что части карты сайта кешируются."
+    )
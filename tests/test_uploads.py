@@ -0,0 +1,97 @@
+import hashlib
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.test import override_settings
+from django.test.client import Client
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Post
+from blog.uploads import ImageUploadHandler, upload_errors
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _jpeg_bytes(size=(100, 100)) -> bytes:
+    image_data = BytesIO()
+    Image.new("RGB", size).save(image_data, "JPEG")
+    return image_data.getvalue()
+
+
+def _form_data(category, image: SimpleUploadedFile) -> dict:
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+        "category": category.id,
+        "image": image,
+    }
+
+
+def test_non_image_upload_is_rejected(user_client: Client,
+                                      published_category):
+    fake = SimpleUploadedFile(
+        "fake.jpg", b"#!/bin/sh\necho not an image\n" * 10,
+        content_type="image/jpeg",
+    )
+    response = user_client.post(
+        "/posts/create/", data=_form_data(published_category, fake)
+    )
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors
+    assert not Post.objects.exists(), (
+        "Убедитесь, что файл, не являющийся изображением, не принимается."
+    )
+
+
+def test_oversize_upload_is_rejected(user_client: Client, published_category):
+    image = SimpleUploadedFile(
+        "big.jpg", _jpeg_bytes((400, 400)), content_type="image/jpeg"
+    )
+    with override_settings(BLOG_IMAGE_MAX_UPLOAD_SIZE=1024):
+        response = user_client.post(
+            "/posts/create/", data=_form_data(published_category, image)
+        )
+    assert "image" in response.context["form"].errors
+    assert not Post.objects.exists(), (
+        "Убедитесь, что слишком большой файл не принимается."
+    )
+
+
+def test_csrf_is_still_enforced(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    image = SimpleUploadedFile(
+        "ok.jpg", _jpeg_bytes(), content_type="image/jpeg"
+    )
+    response = client.post(
+        "/posts/create/", data=_form_data(published_category, image)
+    )
+    assert response.status_code == 403
+    assert not Post.objects.exists()
+
+
+def test_handler_hashes_while_streaming(rf):
+    data = _jpeg_bytes()
+    request = rf.post("/posts/create/")
+    handler = ImageUploadHandler(request)
+    handler.handle_raw_input(None, {}, len(data), b"")
+    handler.new_file("image", "ok.jpg", "image/jpeg", len(data))
+    for start in range(0, len(data), 100):
+        handler.receive_data_chunk(data[start:start + 100], start)
+    uploaded = handler.file_complete(len(data))
+    assert uploaded.content_hash == hashlib.sha256(data).hexdigest()
+    assert not upload_errors(request)
+
+
+def test_handler_stops_at_first_chunk(rf):
+    request = rf.post("/posts/create/")
+    handler = ImageUploadHandler(request)
+    handler.handle_raw_input(None, {}, 10 ** 6, b"")
+    handler.new_file("image", "fake.jpg", "image/jpeg", 10 ** 6)
+    with pytest.raises(SkipFile):
+        handler.receive_data_chunk(b"MZ" + b"\0" * 100, 0)
+    assert "image" in upload_errors(request)